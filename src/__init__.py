@@ -16,40 +16,61 @@ __author__ = "YOLOv8s Pipeline Contributors"
 __description__ = "YOLOv8s 黑熊辨識完整訓練管道"
 
 # 版本兼容性檢查
+import importlib
+import importlib.util
 import sys
+from typing import Any
 
 if sys.version_info < (3, 8):
     raise RuntimeError("需要 Python 3.8 或更高版本")
 
-# 導入核心模組
-from .data import loader, validator
-from .environment import manager, setup
-from .optimization import optuna_optimizer, search_strategies
-from .training import callbacks, trainer
-from .training import utils as training_utils
-from .utils import file_manager, gpu_manager, logger
-
-# 模組可用性檢查
-try:
-    import torch
-
-    TORCH_AVAILABLE = True
-except ImportError:
-    TORCH_AVAILABLE = False
-
-try:
-    import ultralytics
-
-    ULTRALYTICS_AVAILABLE = True
-except ImportError:
-    ULTRALYTICS_AVAILABLE = False
+# 核心模組以 PEP 562 延遲載入：匯入本套件不會連帶載入 torch/ultralytics/optuna，
+# 直到實際存取對應模組時才匯入
+_LAZY_MODULES = {
+    "loader": ".data.loader",
+    "validator": ".data.validator",
+    "manager": ".environment.manager",
+    "setup": ".environment.setup",
+    "optuna_optimizer": ".optimization.optuna_optimizer",
+    "search_strategies": ".optimization.search_strategies",
+    "callbacks": ".training.callbacks",
+    "trainer": ".training.trainer",
+    "training_utils": ".training.utils",
+    "file_manager": ".utils.file_manager",
+    "gpu_manager": ".utils.gpu_manager",
+    "logger": ".utils.logger",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_MODULES:
+        module = importlib.import_module(_LAZY_MODULES[name], __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_MODULES))
+
+
+def _module_available(name: str) -> bool:
+    """
+    僅查找套件而不實際匯入
+
+    已存在於 sys.modules 但 __spec__ 為 None 的模組 (測試替身、部分 vendored 安裝)
+    會讓 find_spec 拋出 ValueError，此時視為不可用。
+    """
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
 
-try:
-    import optuna
 
-    OPTUNA_AVAILABLE = True
-except ImportError:
-    OPTUNA_AVAILABLE = False
+# 模組可用性檢查
+TORCH_AVAILABLE = _module_available("torch")
+ULTRALYTICS_AVAILABLE = _module_available("ultralytics")
+OPTUNA_AVAILABLE = _module_available("optuna")
 
 
 # 功能可用性報告
@@ -2,62 +2,245 @@
 優化策略和搜索空間定義
 """
 
-from typing import Any, Dict, List, Tuple
+import functools
+import inspect
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
 
 import optuna
 from optuna.samplers import CmaEsSampler, RandomSampler, TPESampler
 
+# TPE 預設參數：multivariate 建模參數間相關性，group 將條件式子空間分組處理，
+# constant_liar 避免並行試驗重複採樣相同區域
+_TPE_DEFAULTS: Dict[str, Any] = {
+    "n_startup_trials": 10,
+    "multivariate": True,
+    "group": True,
+    "constant_liar": True,
+    "warn_independent_sampling": False,
+}
+
+# CMA-ES 預設參數：IPOP 重啟策略協助跳出局部最佳
+_CMAES_DEFAULTS: Dict[str, Any] = {
+    "n_startup_trials": 5,
+    "warn_independent_sampling": False,
+    "consider_pruned_trials": True,
+    "restart_strategy": "ipop",
+}
+
+# CMA-ES 自適應選項 (選用第一個此版本支援的)：lr_adapt 適合 mAP 這類帶噪聲的目標，
+# 與 with_margin 互斥；舊版 Optuna 不支援時退回 with_margin 或預設行為
+_CMAES_ADAPTIVE_OPTIONS: Tuple[Dict[str, Any], ...] = (
+    {"lr_adapt": True},
+    {"with_margin": True},
+    {},
+)
+
+# 熊類檢測搜索空間 (每次試驗共用，請勿就地修改)
+_BEAR_SEARCH_SPACE: Dict[str, Dict[str, Any]] = {
+    "lr0": {"min": 1e-5, "max": 1e-2, "log": True, "description": "初始學習率"},
+    "weight_decay": {
+        "min": 1e-6,
+        "max": 1e-2,
+        "log": True,
+        "description": "權重衰減",
+    },
+    "momentum": {"min": 0.8, "max": 0.99, "description": "動量"},
+    "warmup_epochs": {"min": 1, "max": 10, "description": "預熱輪數"},
+    "box": {"min": 5.0, "max": 15.0, "description": "邊界框損失權重"},
+    "cls": {"min": 0.3, "max": 1.5, "description": "分類損失權重"},
+    "dfl": {"min": 1.0, "max": 2.0, "description": "DFL損失權重"},
+}
+
+
+def _compile_suggest_fn(
+    search_space: Dict[str, Dict[str, Any]],
+) -> Callable[[optuna.Trial], Dict[str, Any]]:
+    """
+    依搜索空間生成直線式的參數建議函數
+
+    搜索空間在定義時即固定，預先生成程式碼可省去每次試驗的型別判斷與字典查找。
+    """
+    lines = ["def suggest_bear_parameters(trial):", "    return {"]
+    for name, config in search_space.items():
+        if "min" not in config or "max" not in config:
+            continue
+        low, high = config["min"], config["max"]
+        if isinstance(low, int):
+            call = f"trial.suggest_int({name!r}, {low!r}, {high!r})"
+        else:
+            log = bool(config.get("log", False))
+            call = f"trial.suggest_float({name!r}, {low!r}, {high!r}, log={log!r})"
+        lines.append(f"        {name!r}: {call},")
+    lines.append("    }")
+
+    namespace: Dict[str, Any] = {}
+    exec("\n".join(lines), namespace)
+    suggest_fn = namespace["suggest_bear_parameters"]
+    suggest_fn.__doc__ = "為熊類檢測建議參數"
+    return suggest_fn
+
+
+# 熊類檢測複合分數：(權重, 候選指標名稱)
+# 權重：mAP50 (40%), mAP50-95 (30%), precision (15%), recall (15%)
+_SCORE_TERMS: Tuple[Tuple[float, Tuple[str, ...]], ...] = (
+    (0.4, ("metrics/mAP50(B)", "mAP50")),
+    (0.3, ("metrics/mAP50-95(B)", "mAP50-95")),
+    (0.15, ("metrics/precision(B)", "precision")),
+    (0.15, ("metrics/recall(B)", "recall")),
+)
+
+# 標準化指標名稱 → 候選原始鍵 (依優先度排列)
+_METRIC_MAPPING: Dict[str, Tuple[str, ...]] = {
+    "mAP50": ("metrics/mAP50(B)", "mAP50"),
+    "mAP50-95": ("metrics/mAP50-95(B)", "mAP50-95"),
+    "precision": ("metrics/precision(B)", "precision"),
+    "recall": ("metrics/recall(B)", "recall"),
+    "train_loss": ("train/box_loss", "train_loss"),
+    "val_loss": ("val/box_loss", "val_loss"),
+}
+_STD_METRIC_NAMES: Tuple[str, ...] = tuple(_METRIC_MAPPING)
+
+# 原始鍵 → (標準化名稱, 優先度)
+_RAW_TO_STANDARD: Dict[str, Tuple[str, int]] = {
+    raw_key: (standard_name, rank)
+    for standard_name, raw_keys in _METRIC_MAPPING.items()
+    for rank, raw_key in enumerate(raw_keys)
+}
+
+# TPE→CMA-ES 混合策略切換時機 (已完成試驗數)
+_HYBRID_SWITCH_TRIALS = 40
+
+
+@functools.lru_cache(maxsize=1)
+def _cmaes_parameters() -> FrozenSet[str]:
+    """已安裝 Optuna 版本的 CmaEsSampler 所支援的參數名稱"""
+    return frozenset(inspect.signature(CmaEsSampler).parameters)
+
+
+class HybridSamplerSwitch:
+    """TPE→CMA-ES 混合策略回調：前期以 TPE 探索，完成指定試驗數後改用 CMA-ES"""
+
+    def __init__(self, seed: int = 42, switch_at: int = _HYBRID_SWITCH_TRIALS):
+        self.seed = seed
+        self.switch_at = switch_at
+        self.switched = False
+
+    def __call__(self, study: optuna.Study, trial: optuna.trial.FrozenTrial) -> None:
+        # 以試驗編號計數，避免 study.trials 每次深拷貝全部試驗
+        if self.switched or trial.number + 1 < self.switch_at:
+            return
+
+        completed = study.get_trials(
+            deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,)
+        )
+        # 以 TPE 階段結果熱啟動 CMA-ES 的均值與步長
+        study.sampler = SearchStrategies._create_cmaes_sampler(
+            self.seed, source_trials=completed or None
+        )
+        self.switched = True
+
 
 class SearchStrategies:
     """搜索策略管理器"""
 
     @staticmethod
     def get_bear_detection_search_space() -> Dict[str, Dict[str, Any]]:
-        """獲取熊類檢測專用搜索空間"""
-        return {
-            "lr0": {"min": 1e-5, "max": 1e-2, "log": True, "description": "初始學習率"},
-            "weight_decay": {
-                "min": 1e-6,
-                "max": 1e-2,
-                "log": True,
-                "description": "權重衰減",
-            },
-            "momentum": {"min": 0.8, "max": 0.99, "description": "動量"},
-            "warmup_epochs": {"min": 1, "max": 10, "description": "預熱輪數"},
-            "box": {"min": 5.0, "max": 15.0, "description": "邊界框損失權重"},
-            "cls": {"min": 0.3, "max": 1.5, "description": "分類損失權重"},
-            "dfl": {"min": 1.0, "max": 2.0, "description": "DFL損失權重"},
-        }
+        """獲取熊類檢測專用搜索空間 (共用實例，修改前請先複製)"""
+        return _BEAR_SEARCH_SPACE
 
     @staticmethod
     def get_sampler(
-        strategy: str = "tpe", seed: int = 42
+        strategy: str = "tpe", seed: int = 42, **sampler_kwargs: Any
     ) -> optuna.samplers.BaseSampler:
-        """獲取採樣器"""
-        if strategy == "tpe":
-            return TPESampler(seed=seed, n_startup_trials=10)
+        """
+        獲取採樣器
+
+        Args:
+            strategy: 採樣策略 (tpe, cmaes, random, tpe_cmaes)
+                tpe_cmaes 先回傳 TPE 採樣器，需搭配 get_callbacks() 於優化時切換
+            seed: 隨機種子
+            **sampler_kwargs: 覆寫採樣器預設參數，例如
+                ``multivariate=False`` 可恢復 TPE 獨立採樣
+                (未另外指定 group 時會一併關閉 group，Optuna 要求 group 搭配 multivariate)
+        """
+        if strategy in ("tpe", "tpe_cmaes"):
+            kwargs = {**_TPE_DEFAULTS, **sampler_kwargs}
+            if not kwargs["multivariate"] and "group" not in sampler_kwargs:
+                kwargs["group"] = False
+            return TPESampler(seed=seed, **kwargs)
         elif strategy == "cmaes":
-            return CmaEsSampler(seed=seed)
+            return SearchStrategies._create_cmaes_sampler(seed, **sampler_kwargs)
         elif strategy == "random":
             return RandomSampler(seed=seed)
         else:
             return TPESampler(seed=seed)
 
     @staticmethod
-    def get_pruner(strategy: str = "median") -> optuna.pruners.BasePruner:
-        """獲取剪枝器"""
+    def _create_cmaes_sampler(seed: int, **sampler_kwargs: Any) -> CmaEsSampler:
+        """創建 CMA-ES 採樣器，依 Optuna 版本選用可用的自適應選項"""
+        supported = _cmaes_parameters()
+
+        # 預設參數只保留此版本支援的；呼叫端傳入的參數原樣傳遞，錯誤直接拋出
+        kwargs = {k: v for k, v in _CMAES_DEFAULTS.items() if k in supported}
+        kwargs.update(sampler_kwargs)
+
+        # 呼叫端已指定自適應選項或使用 separable CMA-ES (與兩者互斥) 時不再自動加入
+        if not (
+            "lr_adapt" in kwargs
+            or "with_margin" in kwargs
+            or kwargs.get("use_separable_cma")
+        ):
+            for option in _CMAES_ADAPTIVE_OPTIONS:
+                if supported.issuperset(option):
+                    kwargs.update(option)
+                    break
+
+        return CmaEsSampler(seed=seed, **kwargs)
+
+    @staticmethod
+    def get_callbacks(
+        strategy: str = "tpe", seed: int = 42
+    ) -> List[Callable[[optuna.Study, optuna.trial.FrozenTrial], None]]:
+        """獲取採樣策略所需的 study.optimize 回調"""
+        if strategy == "tpe_cmaes":
+            return [HybridSamplerSwitch(seed=seed)]
+        return []
+
+    @staticmethod
+    def get_pruner(
+        strategy: str = "median", patience: int = 3
+    ) -> optuna.pruners.BasePruner:
+        """
+        獲取剪枝器
+
+        Args:
+            strategy: 剪枝策略 (median, percentile, hyperband, asha)
+            patience: median/percentile 剪枝前容忍的無改善步數，
+                YOLO 早期 mAP 噪聲大，避免誤剪最終表現好的試驗
+        """
         if strategy == "median":
-            return optuna.pruners.MedianPruner(
-                n_startup_trials=5, n_warmup_steps=30, interval_steps=10
+            return optuna.pruners.PatientPruner(
+                optuna.pruners.MedianPruner(
+                    n_startup_trials=5, n_warmup_steps=20, interval_steps=5
+                ),
+                patience=patience,
             )
         elif strategy == "percentile":
-            return optuna.pruners.PercentilePruner(
-                percentile=25.0, n_startup_trials=5, n_warmup_steps=30
+            return optuna.pruners.PatientPruner(
+                optuna.pruners.PercentilePruner(
+                    percentile=25.0, n_startup_trials=5, n_warmup_steps=20
+                ),
+                patience=patience,
             )
         elif strategy == "hyperband":
             return optuna.pruners.HyperbandPruner(
                 min_resource=10, max_resource=100, reduction_factor=3
             )
+        elif strategy == "asha":
+            # 非同步連續減半，無 Hyperband 的同步屏障，適合多 GPU 並行試驗
+            return optuna.pruners.SuccessiveHalvingPruner(
+                min_resource=10, reduction_factor=3, min_early_stopping_rate=0
+            )
         else:
             return optuna.pruners.MedianPruner()
 
@@ -67,38 +250,59 @@ class SearchStrategies:
         strategy: str = "tpe",
         pruner_strategy: str = "median",
         seed: int = 42,
+        storage: Optional[str] = None,
+        load_if_exists: bool = True,
     ) -> optuna.Study:
-        """創建優化研究"""
+        """
+        創建優化研究
+
+        使用持久化存儲後可多進程/多 GPU 並行執行試驗，例如
+        ``study.optimize(objective, n_jobs=gpu_count)``；
+        並行優化 (n_jobs > 1) 時建議使用 pruner_strategy="asha"。
+        策略所需的回調 (get_callbacks()，如 tpe_cmaes 的採樣器切換) 會綁定到
+        回傳研究的 ``study.optimize``，與呼叫端傳入的 callbacks 一併執行。
+
+        Args:
+            study_name: 研究名稱
+            strategy: 採樣策略
+            pruner_strategy: 剪枝策略
+            seed: 隨機種子
+            storage: 存儲 URL，預設為 ``sqlite:///{study_name}.db``
+            load_if_exists: 同名研究已存在時是否接續
+        """
         sampler = SearchStrategies.get_sampler(strategy, seed)
         pruner = SearchStrategies.get_pruner(pruner_strategy)
 
+        if storage is None:
+            storage = f"sqlite:///{study_name}.db"
+
         study = optuna.create_study(
-            study_name=study_name, direction="maximize", sampler=sampler, pruner=pruner
+            study_name=study_name,
+            direction="maximize",
+            sampler=sampler,
+            pruner=pruner,
+            storage=storage,
+            load_if_exists=load_if_exists,
         )
 
+        strategy_callbacks = SearchStrategies.get_callbacks(strategy, seed)
+        if strategy_callbacks:
+            optimize = study.optimize
+
+            @functools.wraps(optimize)
+            def optimize_with_strategy_callbacks(*args: Any, **kwargs: Any) -> None:
+                kwargs["callbacks"] = [
+                    *strategy_callbacks,
+                    *(kwargs.get("callbacks") or ()),
+                ]
+                optimize(*args, **kwargs)
+
+            study.optimize = optimize_with_strategy_callbacks
+
         return study
 
-    @staticmethod
-    def suggest_bear_parameters(trial: optuna.Trial) -> Dict[str, Any]:
-        """為熊類檢測建議參數"""
-        search_space = SearchStrategies.get_bear_detection_search_space()
-        params = {}
-
-        for param_name, config in search_space.items():
-            if "min" in config and "max" in config:
-                if isinstance(config["min"], int):
-                    params[param_name] = trial.suggest_int(
-                        param_name, config["min"], config["max"]
-                    )
-                else:
-                    params[param_name] = trial.suggest_float(
-                        param_name,
-                        config["min"],
-                        config["max"],
-                        log=config.get("log", False),
-                    )
-
-        return params
+    # 為熊類檢測建議參數 (由搜索空間預先生成)
+    suggest_bear_parameters = staticmethod(_compile_suggest_fn(_BEAR_SEARCH_SPACE))
 
 
 class OptimizationMetrics:
@@ -107,74 +311,44 @@ class OptimizationMetrics:
     @staticmethod
     def calculate_bear_detection_score(val_results) -> float:
         """計算熊類檢測分數"""
-        try:
-            if hasattr(val_results, "results_dict"):
-                metrics = val_results.results_dict
-            else:
-                metrics = val_results
-
-            # 主要指標
-            map50 = metrics.get("metrics/mAP50(B)", 0.0)
-            map50_95 = metrics.get("metrics/mAP50-95(B)", 0.0)
-            precision = metrics.get("metrics/precision(B)", 0.0)
-            recall = metrics.get("metrics/recall(B)", 0.0)
-
-            # 備用指標名稱
-            if map50 == 0.0:
-                map50 = metrics.get("mAP50", 0.0)
-            if map50_95 == 0.0:
-                map50_95 = metrics.get("mAP50-95", 0.0)
-
-            # 計算複合分數
-            # 權重：mAP50 (40%), mAP50-95 (30%), precision (15%), recall (15%)
-            score = 0.4 * map50 + 0.3 * map50_95 + 0.15 * precision + 0.15 * recall
+        metrics = getattr(val_results, "results_dict", val_results) or {}
+        if not isinstance(metrics, dict):
+            return 0.0
 
+        # 計算複合分數 (依序查找主要與備用指標名稱)
+        try:
+            score = sum(
+                weight * next((metrics[key] for key in keys if key in metrics), 0.0)
+                for weight, keys in _SCORE_TERMS
+            )
             return float(score)
-
-        except Exception:
+        except (TypeError, ValueError):
+            # 指標值非數值
             return 0.0
 
     @staticmethod
     def extract_training_metrics(results) -> Dict[str, float]:
         """提取訓練指標"""
-        metrics = {}
+        metrics = dict.fromkeys(_STD_METRIC_NAMES, 0.0)
 
-        try:
-            if hasattr(results, "results_dict"):
-                raw_metrics = results.results_dict
-            else:
-                raw_metrics = results
-
-            # 標準化指標名稱
-            metric_mapping = {
-                "mAP50": ["metrics/mAP50(B)", "mAP50"],
-                "mAP50-95": ["metrics/mAP50-95(B)", "mAP50-95"],
-                "precision": ["metrics/precision(B)", "precision"],
-                "recall": ["metrics/recall(B)", "recall"],
-                "train_loss": ["train/box_loss", "train_loss"],
-                "val_loss": ["val/box_loss", "val_loss"],
-            }
-
-            for standard_name, possible_keys in metric_mapping.items():
-                for key in possible_keys:
-                    if key in raw_metrics:
-                        metrics[standard_name] = float(raw_metrics[key])
-                        break
-                else:
-                    metrics[standard_name] = 0.0
-
-        except Exception:
-            # 如果提取失敗，返回空指標
-            metrics = {
-                name: 0.0
-                for name in [
-                    "mAP50",
-                    "mAP50-95",
-                    "precision",
-                    "recall",
-                    "train_loss",
-                    "val_loss",
-                ]
-            }
+        raw_metrics = getattr(results, "results_dict", results) or {}
+        if not isinstance(raw_metrics, dict):
+            return metrics
+
+        # 單次掃描原始指標，別名衝突時保留優先度較高者
+        matched_rank: Dict[str, int] = {}
+        for key, value in raw_metrics.items():
+            entry = _RAW_TO_STANDARD.get(key)
+            if entry is None:
+                continue
+            standard_name, rank = entry
+            previous = matched_rank.get(standard_name)
+            if previous is None or rank < previous:
+                try:
+                    metrics[standard_name] = float(value)
+                except (TypeError, ValueError):
+                    # 非數值指標視為缺失
+                    continue
+                matched_rank[standard_name] = rank
 
         return metrics
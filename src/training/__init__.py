@@ -1,9 +1,30 @@
 """
 訓練模組
+
+使用 PEP 562 延遲載入：匯入本套件時不會立即載入 ultralytics/torch，
+直到實際存取對應類別時才匯入子模組。
 """
 
-from .callbacks import TrainingCallbacks
-from .trainer import YOLOv8sTrainer
-from .utils import TrainingUtils
+import importlib
+from typing import Any
+
+_LAZY_ATTRS = {
+    "YOLOv8sTrainer": ".trainer",
+    "TrainingCallbacks": ".callbacks",
+    "TrainingUtils": ".utils",
+}
 
 __all__ = ["YOLOv8sTrainer", "TrainingCallbacks", "TrainingUtils"]
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_ATTRS:
+        module = importlib.import_module(_LAZY_ATTRS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_ATTRS))
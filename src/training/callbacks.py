@@ -2,9 +2,30 @@
 訓練回調函數
 """
 
+import logging
 import time
-from datetime import datetime
-from typing import Any, Callable, Dict, List
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _log_callback_error(error: Exception) -> None:
+    """預設回調錯誤處理：記錄警告後繼續執行"""
+    logger.warning("⚠️  回調函數錯誤: %s", error)
+
+
+def _guard_callback(
+    callback: Callable, on_error: Callable[[Exception], None]
+) -> Callable:
+    """包裝回調函數，發生錯誤時交由 on_error 處理"""
+
+    def guarded(*args, **kwargs):
+        try:
+            return callback(*args, **kwargs)
+        except Exception as e:
+            on_error(e)
+
+    return guarded
 
 
 class TrainingCallbacks:
@@ -21,50 +42,74 @@ class TrainingCallbacks:
         }
 
         self.metrics_history = []
-        self.start_time = None
+        self.start_time = time.perf_counter()
+        # 牆鐘起始時間；各輪只記錄 elapsed，需要時間戳時再由此推導 (見 calculate_training_stats)
+        self.start_wall_time = time.time()
+
+        # 各指標的累計統計 (sum/count/best)，避免每次摘要重新掃描歷史
+        self._running: Dict[str, Dict[str, float]] = {}
+
+    def add_callback(
+        self,
+        event: str,
+        callback: Callable,
+        on_error: Optional[Callable[[Exception], None]] = None,
+    ):
+        """
+        添加回調函數
 
-    def add_callback(self, event: str, callback: Callable):
-        """添加回調函數"""
+        Args:
+            event: 事件名稱
+            callback: 回調函數
+            on_error: 錯誤處理函數 (如 _log_callback_error 記錄警告後繼續)；
+                預設 None 不包裝，錯誤直接拋出
+        """
         if event in self.callbacks:
+            if on_error is not None:
+                callback = _guard_callback(callback, on_error)
             self.callbacks[event].append(callback)
 
+    def _dispatch(self, event: str, *args, **kwargs):
+        """依序呼叫事件的回調函數 (不攔截錯誤，錯誤處理於註冊時以 on_error 指定)"""
+        for callback in self.callbacks.get(event, ()):
+            callback(*args, **kwargs)
+
     def trigger_callbacks(self, event: str, *args, **kwargs):
         """觸發回調函數"""
-        if event in self.callbacks:
-            for callback in self.callbacks[event]:
-                try:
-                    callback(*args, **kwargs)
-                except Exception as e:
-                    print(f"⚠️  回調函數錯誤: {e}")
+        self._dispatch(event, *args, **kwargs)
+
+    def on_batch_start(self, *args, **kwargs):
+        """觸發批次開始回調"""
+        self._dispatch("on_batch_start", *args, **kwargs)
+
+    def on_batch_end(self, *args, **kwargs):
+        """觸發批次結束回調"""
+        self._dispatch("on_batch_end", *args, **kwargs)
 
     def log_metrics(self, epoch: int, metrics: Dict[str, float]):
         """記錄指標"""
-        entry = {
-            "epoch": epoch,
-            "timestamp": datetime.now().isoformat(),
-            "metrics": metrics,
-        }
+        # 相對 start_time 的單調秒數，不受系統時鐘調整影響
+        elapsed = time.perf_counter() - self.start_time
+        entry = {"epoch": epoch, "elapsed": elapsed, "metrics": metrics}
         self.metrics_history.append(entry)
 
+        for metric, value in metrics.items():
+            stats = self._running.get(metric)
+            if stats is None:
+                stats = self._running[metric] = {
+                    "sum": 0.0,
+                    "count": 0,
+                    "best": float("-inf"),
+                }
+            stats["sum"] += value
+            stats["count"] += 1
+            if value > stats["best"]:
+                stats["best"] = value
+
     def get_metrics_summary(self) -> Dict[str, Any]:
         """獲取指標摘要"""
-        if not self.metrics_history:
-            return {}
-
         # 計算平均值和最佳值
-        summary = {}
-        for entry in self.metrics_history:
-            for metric, value in entry["metrics"].items():
-                if metric not in summary:
-                    summary[metric] = {"values": [], "best": value, "avg": 0}
-
-                summary[metric]["values"].append(value)
-                if value > summary[metric]["best"]:
-                    summary[metric]["best"] = value
-
-        # 計算平均值
-        for metric in summary:
-            values = summary[metric]["values"]
-            summary[metric]["avg"] = sum(values) / len(values)
-
-        return summary
+        return {
+            metric: {"best": stats["best"], "avg": stats["sum"] / stats["count"]}
+            for metric, stats in self._running.items()
+        }
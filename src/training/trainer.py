@@ -3,14 +3,97 @@ YOLOv8s 訓練器 - 修復版本
 整合所有訓練功能的統一界面
 """
 
+import functools
+import logging
 import os
+import warnings
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import torch
 import yaml
 from ultralytics import YOLO
 
+from ..utils.file_manager import get_file_manager
+
+logger = logging.getLogger(__name__)
+
+# 優先使用 libyaml C 實作的 Dumper
+_YAML_DUMPER = getattr(yaml, "CDumper", yaml.Dumper)
+
+if not getattr(yaml, "__with_libyaml__", False):
+    warnings.warn(
+        "PyYAML 未啟用 libyaml，YAML 讀寫將使用較慢的純 Python 實作", RuntimeWarning
+    )
+
+# 預設最佳參數 (基於原始訓練腳本驗證)
+_DEFAULT_BEST_PARAMS: Dict[str, Any] = {
+    "optimizer": "AdamW",
+    "lr0": 0.00038,
+    "lrf": 0.08,
+    "momentum": 0.937,
+    "weight_decay": 0.0006,
+    "cos_lr": True,
+    "warmup_epochs": 5.0,
+    "cls": 1.2,
+    "box": 0.05,
+    "dfl": 1.5,
+    "hsv_h": 0.015,
+    "hsv_s": 0.7,
+    "hsv_v": 0.4,
+    "degrees": 5,
+    "translate": 0.3,
+    "scale": 0.24,
+    "fliplr": 0.25,
+    "flipud": 0,
+    "mosaic": 0.125,
+    "mixup": 0.08,
+}
+
+# 可由最佳參數覆寫的訓練參數鍵
+_ALLOWED_BEST_KEYS = frozenset(_DEFAULT_BEST_PARAMS)
+
+# 最佳參數候選路徑的存在性快取 (進程內有效，以 YOLOv8sTrainer.reset_cache() 清除)
+_best_params_probe_cache: Dict[str, bool] = {}
+
+
+def _best_params_file_exists(path: str) -> bool:
+    """檢查最佳參數文件是否存在，結果於進程內快取"""
+    exists = _best_params_probe_cache.get(path)
+    if exists is None:
+        exists = _best_params_probe_cache[path] = os.path.exists(path)
+    return exists
+
+
+@functools.lru_cache(maxsize=1)
+def _probe_gpu() -> Tuple[bool, int]:
+    """
+    偵測 GPU (每個進程僅執行一次)
+
+    偵測訊息也只在首次呼叫時輸出，避免超參數搜索的每次試驗重複打印。
+
+    Returns:
+        (CUDA 是否可用, GPU 數量)
+    """
+    if not torch.cuda.is_available():
+        logger.warning("⚠️  未檢測到GPU，使用CPU模式")
+        return False, 0
+
+    gpu_count = torch.cuda.device_count()
+    logger.info("✅ 檢測到 %d 個GPU", gpu_count)
+    return True, gpu_count
+
+
+def _is_compile_error(error: BaseException) -> bool:
+    """判斷例外 (含其 __cause__/__context__ 鏈) 是否來自 torch._dynamo / inductor 編譯"""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if type(error).__module__.startswith(("torch._dynamo", "torch._inductor")):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
 
 class YOLOv8sTrainer:
     """YOLOv8s 訓練器 - 簡化版本，基於原始代碼的核心功能"""
@@ -38,6 +121,16 @@ class YOLOv8sTrainer:
         self.batch_size = training_config.get("batch_size", 64)
         self.patience = training_config.get("patience", 40)
 
+        # torch.compile (inductor) 加速，首個 epoch 需額外編譯時間
+        self.compile = training_config.get("compile", False)
+
+        # 混合精度訓練 (AMP)
+        self.amp = config.get("amp", {}).get("enable", True)
+
+        # 數據載入：多進程 worker 平行解碼/增強；快取模式未指定時使用 RAM (不足時由 Ultralytics 停用)
+        self.workers = training_config.get("workers", min(8, os.cpu_count() or 2))
+        self.cache = training_config.get("cache")
+
         # 路徑配置
         self.data_yaml = "./data.yaml"
         self.project_dir = "./results/training"
@@ -46,6 +139,22 @@ class YOLOv8sTrainer:
         # 模型和狀態
         self.model = None
         self.best_params = None
+        # 本次訓練已完成的 epoch 數 (判斷編譯失敗是否發生在首個 epoch 前)
+        self._epochs_completed = 0
+
+        # GPU 配置於初始化時決定一次，後續訓練直接沿用
+        self._gpu_config = self._detect_gpu_config()
+
+    @staticmethod
+    def reset_cache() -> None:
+        """
+        清除進程內的偵測快取
+
+        在同一進程中新寫入最佳參數文件或 GPU 狀態改變後呼叫，
+        之後建立的訓練器會重新偵測。
+        """
+        _best_params_probe_cache.clear()
+        _probe_gpu.cache_clear()
 
     def _get_timestamp(self) -> str:
         """獲取時間戳"""
@@ -66,7 +175,7 @@ class YOLOv8sTrainer:
             return True
 
         except Exception as e:
-            print(f"❌ 環境設置失敗: {e}")
+            logger.error("❌ 環境設置失敗: %s", e)
             return False
 
     def _create_default_data_yaml(self):
@@ -83,29 +192,60 @@ class YOLOv8sTrainer:
         }
 
         with open(self.data_yaml, "w", encoding="utf-8") as f:
-            yaml.dump(data_config, f, default_flow_style=False, allow_unicode=True)
+            yaml.dump(
+                data_config,
+                f,
+                Dumper=_YAML_DUMPER,
+                default_flow_style=False,
+                allow_unicode=True,
+            )
 
-        print(f"✅ 已創建數據配置: {self.data_yaml}")
+        logger.info("✅ 已創建數據配置: %s", self.data_yaml)
 
     def load_model(self) -> bool:
         """載入模型"""
         try:
             model_path = f"{self.model_size}.pt"
             self.model = YOLO(model_path)
-            print(f"✅ 模型已載入: {model_path}")
+            logger.info("✅ 模型已載入: %s", model_path)
+            self.model.add_callback("on_train_epoch_end", self._on_train_epoch_end)
+
+            # Ultralytics 訓練時會重建模型，channels_last 需在訓練器建好模型後套用；
+            # 多 GPU 時 Ultralytics 在 DDP 子進程重建訓練器，此處註冊的回調不會傳入
+            if self._gpu_config["multi_gpu"]:
+                logger.info(
+                    "ℹ️  多 GPU (DDP) 訓練不套用 channels_last：回調無法傳入 DDP 子進程"
+                )
+            elif self._gpu_config["use_gpu"]:
+                self.model.add_callback(
+                    "on_pretrain_routine_end", self._apply_channels_last
+                )
             return True
 
         except Exception as e:
-            print(f"❌ 模型載入失敗: {e}")
+            logger.error("❌ 模型載入失敗: %s", e)
             return False
 
+    @staticmethod
+    def _apply_channels_last(trainer) -> None:
+        """
+        Ultralytics 回調：訓練模型改用 channels_last (NHWC)，卷積可走 Tensor Core 路徑
+
+        僅適用單 GPU 訓練；多 GPU 時 DDP 子進程重建的訓練器不會執行此回調。
+        """
+        trainer.model.to(memory_format=torch.channels_last)
+
+    def _on_train_epoch_end(self, trainer) -> None:
+        """Ultralytics 回調：記錄已完成的 epoch 數"""
+        self._epochs_completed += 1
+
     def load_best_params(
         self, params: Optional[Dict[str, Any]] = None
     ) -> Optional[Dict[str, Any]]:
         """載入最佳參數"""
         if params:
             self.best_params = params
-            print("✅ 已載入傳入的最佳參數")
+            logger.info("✅ 已載入傳入的最佳參數")
             return self.best_params
 
         # 嘗試從文件載入最佳參數
@@ -116,44 +256,30 @@ class YOLOv8sTrainer:
         ]
 
         for path in best_params_paths:
-            if os.path.exists(path):
+            if _best_params_file_exists(path):
                 try:
-                    with open(path, "r", encoding="utf-8") as f:
-                        self.best_params = yaml.safe_load(f)
-                    print(f"✅ 已從 {path} 載入最佳參數")
+                    self.best_params = get_file_manager().load_config(path)
+                    logger.info("✅ 已從 %s 載入最佳參數", path)
                     return self.best_params
+                except FileNotFoundError:
+                    _best_params_probe_cache[path] = False
+                    continue
                 except Exception as e:
-                    print(f"⚠️  從 {path} 載入參數失敗: {e}")
+                    logger.warning("⚠️  從 %s 載入參數失敗: %s", path, e)
                     continue
 
         # 使用預設最佳參數
-        self.best_params = {
-            "optimizer": "AdamW",
-            "lr0": 0.00038,
-            "lrf": 0.08,
-            "momentum": 0.937,
-            "weight_decay": 0.0006,
-            "cos_lr": True,
-            "warmup_epochs": 5.0,
-            "cls": 1.2,
-            "box": 0.05,
-            "dfl": 1.5,
-            "hsv_h": 0.015,
-            "hsv_s": 0.7,
-            "hsv_v": 0.4,
-            "degrees": 5,
-            "translate": 0.3,
-            "scale": 0.24,
-            "fliplr": 0.25,
-            "flipud": 0,
-            "mosaic": 0.125,
-            "mixup": 0.08,
-        }
-        print("✅ 使用預設最佳參數")
+        self.best_params = dict(_DEFAULT_BEST_PARAMS)
+        logger.info("✅ 使用預設最佳參數")
         return self.best_params
 
     def setup_gpu_config(self) -> Dict[str, Any]:
-        """設置GPU配置"""
+        """設置GPU配置 (回傳初始化時偵測的結果)"""
+        return self._gpu_config
+
+    @staticmethod
+    def _detect_gpu_config() -> Dict[str, Any]:
+        """依偵測結果建立GPU配置"""
         gpu_config = {
             "use_gpu": False,
             "device": "cpu",
@@ -161,8 +287,8 @@ class YOLOv8sTrainer:
             "device_ids": [0],
         }
 
-        if torch.cuda.is_available():
-            gpu_count = torch.cuda.device_count()
+        cuda_available, gpu_count = _probe_gpu()
+        if cuda_available:
             gpu_config.update(
                 {
                     "use_gpu": True,
@@ -172,12 +298,19 @@ class YOLOv8sTrainer:
                 }
             )
 
-            print(f"✅ 檢測到 {gpu_count} 個GPU")
-        else:
-            print("⚠️  未檢測到GPU，使用CPU模式")
-
         return gpu_config
 
+    def _resolve_cache_mode(self) -> Union[str, bool]:
+        """
+        決定數據快取模式：未指定時使用 RAM 快取
+
+        Ultralytics 建立數據集時會依影像大小與可用記憶體檢查 RAM 快取，
+        記憶體不足時自動改為不快取，無需在此掃描數據集估算。
+        """
+        if self.cache is not None:
+            return self.cache
+        return "ram"
+
     def _prepare_training_args(self) -> Dict[str, Any]:
         """準備訓練參數"""
         # 基礎參數
@@ -192,6 +325,9 @@ class YOLOv8sTrainer:
             "exist_ok": True,
             "plots": True,
             "verbose": True,
+            "amp": self.amp,
+            "workers": self.workers,
+            "cache": self._resolve_cache_mode(),
         }
 
         # GPU配置
@@ -204,40 +340,21 @@ class YOLOv8sTrainer:
         else:
             train_args["device"] = "cpu"
 
-        # 載入最佳參數
+        # torch.compile 需 PyTorch 2.0+ 與 GPU；關閉 deterministic 以允許 inductor 自動調校
+        if self.compile and gpu_config["use_gpu"] and hasattr(torch, "compile"):
+            train_args["compile"] = True
+            train_args["deterministic"] = False
+
+        # 載入最佳參數 (缺少的鍵以預設最佳參數補齊，未知的鍵忽略)
+        train_args.update(_DEFAULT_BEST_PARAMS)
         if self.best_params:
-            # 訓練參數
-            for key in [
-                "lr0",
-                "lrf",
-                "momentum",
-                "weight_decay",
-                "warmup_epochs",
-                "cos_lr",
-            ]:
-                if key in self.best_params:
-                    train_args[key] = self.best_params[key]
-
-            # 損失函數權重
-            for key in ["cls", "box", "dfl"]:
-                if key in self.best_params:
-                    train_args[key] = self.best_params[key]
-
-            # 數據增強參數
-            for key in [
-                "hsv_h",
-                "hsv_s",
-                "hsv_v",
-                "degrees",
-                "translate",
-                "scale",
-                "fliplr",
-                "flipud",
-                "mosaic",
-                "mixup",
-            ]:
-                if key in self.best_params:
-                    train_args[key] = self.best_params[key]
+            train_args.update(
+                {
+                    key: value
+                    for key, value in self.best_params.items()
+                    if key in _ALLOWED_BEST_KEYS
+                }
+            )
 
         return train_args
 
@@ -257,22 +374,39 @@ class YOLOv8sTrainer:
             train_args = self._prepare_training_args()
 
             # 執行訓練
-            print(f"📊 訓練參數:")
-            print(f"   模型: {self.model_size}")
-            print(f"   輪數: {self.epochs}")
-            print(f"   批次大小: {train_args.get('batch', self.batch_size)}")
-            print(f"   圖片大小: {self.img_size}")
+            logger.info(
+                "📊 訓練參數:\n   模型: %s\n   輪數: %s\n   批次大小: %s\n   圖片大小: %s",
+                self.model_size,
+                self.epochs,
+                train_args.get("batch", self.batch_size),
+                self.img_size,
+            )
 
-            results = self.model.train(**train_args)
+            self._epochs_completed = 0
+            try:
+                results = self.model.train(**train_args)
+            except Exception as e:
+                # 僅在首個 epoch 完成前的編譯失敗退回 eager 模式重新訓練；
+                # 其他錯誤 (數據、OOM 等) 或訓練中途的失敗直接拋出
+                if (
+                    not train_args.get("compile")
+                    or self._epochs_completed
+                    or not _is_compile_error(e)
+                ):
+                    raise
+                logger.warning("⚠️  torch.compile 失敗，改用 eager 模式: %s", e)
+                train_args.pop("compile")
+                train_args.pop("deterministic", None)
+                results = self.model.train(**train_args)
 
             # 解析結果
             training_results = self._parse_results(results)
 
-            print("✅ 訓練完成!")
+            logger.info("✅ 訓練完成!")
             return training_results
 
         except Exception as e:
-            print(f"❌ 訓練失敗: {e}")
+            logger.error("❌ 訓練失敗: %s", e)
             return {"success": False, "error": str(e)}
 
     def _parse_results(self, results) -> Dict[str, Any]:
@@ -334,7 +468,7 @@ class YOLOv8sTrainer:
                 return None
 
         except Exception as e:
-            print(f"❌ 完整訓練流程失敗: {e}")
+            logger.error("❌ 完整訓練流程失敗: %s", e)
             results = {"success": False, "error": str(e)}
             return results
 
@@ -345,7 +479,7 @@ class YOLOv8sTrainer:
                 results = self.model.val()
                 return {"success": True, "validation_metrics": results}
         except Exception as e:
-            print(f"⚠️  模型驗證失敗: {e}")
+            logger.warning("⚠️  模型驗證失敗: %s", e)
             return {"success": False, "error": str(e)}
 
     def _export_model(self) -> Optional[Dict[str, Any]]:
@@ -355,5 +489,5 @@ class YOLOv8sTrainer:
                 export_path = self.model.export(format="onnx")
                 return {"success": True, "export_path": export_path}
         except Exception as e:
-            print(f"⚠️  模型導出失敗: {e}")
+            logger.warning("⚠️  模型導出失敗: %s", e)
             return {"success": False, "error": str(e)}
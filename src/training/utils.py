@@ -2,9 +2,8 @@
 訓練工具函數
 """
 
-import json
+import logging
 import os
-import shutil
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -12,6 +11,13 @@ import matplotlib.pyplot as plt
 import numpy as np
 import yaml
 
+from ..utils import file_manager
+
+logger = logging.getLogger(__name__)
+
+# 優先使用 libyaml C 實作的 Dumper (完整 Dumper，支援 Path、numpy 等物件)
+_YAML_DUMPER = getattr(yaml, "CDumper", yaml.Dumper)
+
 
 class TrainingUtils:
     """訓練工具類"""
@@ -19,21 +25,26 @@ class TrainingUtils:
     @staticmethod
     def create_timestamp() -> str:
         """創建時間戳"""
-        return datetime.now().strftime("%Y%m%d_%H%M%S")
+        return file_manager.create_timestamp()
 
     @staticmethod
     def save_training_config(config: Dict[str, Any], save_path: str) -> None:
         """保存訓練配置"""
         os.makedirs(os.path.dirname(save_path), exist_ok=True)
         with open(save_path, "w", encoding="utf-8") as f:
-            yaml.dump(config, f, default_flow_style=False, allow_unicode=True)
+            yaml.dump(
+                config,
+                f,
+                Dumper=_YAML_DUMPER,
+                default_flow_style=False,
+                allow_unicode=True,
+            )
 
     @staticmethod
     def save_training_results(results: Dict[str, Any], save_path: str) -> None:
         """保存訓練結果"""
         os.makedirs(os.path.dirname(save_path), exist_ok=True)
-        with open(save_path, "w", encoding="utf-8") as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+        file_manager.write_json(results, save_path)
 
     @staticmethod
     def backup_model(model_path: str, backup_dir: str, prefix: str = "backup") -> str:
@@ -43,7 +54,7 @@ class TrainingUtils:
         backup_path = os.path.join(backup_dir, backup_name)
 
         os.makedirs(backup_dir, exist_ok=True)
-        shutil.copy2(model_path, backup_path)
+        file_manager.copy_without_cache(model_path, backup_path)
 
         return backup_path
 
@@ -68,66 +79,120 @@ class TrainingUtils:
         if num_metrics == 0:
             return
 
-        fig, axes = plt.subplots(2, 2, figsize=(15, 10))
-        axes = axes.flatten()
-
-        colors = ["blue", "red", "green", "orange", "purple", "brown"]
-
-        for i, (metric_name, values) in enumerate(metrics_data.items()):
-            if i >= len(axes):
-                break
-
-            ax = axes[i]
-            ax.plot(
-                epochs,
-                values,
-                color=colors[i % len(colors)],
-                linewidth=2,
-                marker="o",
-                markersize=4,
-            )
-            ax.set_title(f"{metric_name}", fontsize=12, fontweight="bold")
-            ax.set_xlabel("Epoch")
-            ax.set_ylabel(metric_name)
-            ax.grid(True, alpha=0.3)
-
-        # 隱藏未使用的子圖
-        for i in range(num_metrics, len(axes)):
-            axes[i].set_visible(False)
-
-        plt.tight_layout()
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
-        plt.savefig(save_path, dpi=300, bbox_inches="tight")
-        plt.close()
+        # 長訓練時不繪製標記點，並簡化折線以降低光柵化成本
+        marker = "o" if len(epochs) <= 100 else None
+        rc = {"path.simplify": True, "path.simplify_threshold": 1.0}
+
+        with plt.rc_context(rc):
+            fig, axes = plt.subplots(2, 2, figsize=(15, 10))
+            axes = axes.flatten()
+
+            colors = ["blue", "red", "green", "orange", "purple", "brown"]
+
+            for i, (metric_name, values) in enumerate(metrics_data.items()):
+                if i >= len(axes):
+                    break
+
+                ax = axes[i]
+                ax.plot(
+                    epochs,
+                    values,
+                    color=colors[i % len(colors)],
+                    linewidth=2,
+                    marker=marker,
+                    markersize=4,
+                )
+                ax.set_title(f"{metric_name}", fontsize=12, fontweight="bold")
+                ax.set_xlabel("Epoch")
+                ax.set_ylabel(metric_name)
+                ax.grid(True, alpha=0.3)
+
+            # 隱藏未使用的子圖
+            for i in range(num_metrics, len(axes)):
+                axes[i].set_visible(False)
+
+            plt.tight_layout()
+            os.makedirs(os.path.dirname(save_path), exist_ok=True)
+            # 120 DPI 足夠檢視訓練曲線；副檔名為 .svg 時輸出向量圖
+            plt.savefig(save_path, dpi=120, bbox_inches="tight")
+            plt.close(fig)
 
     @staticmethod
-    def calculate_training_stats(metrics_history: List[Dict]) -> Dict[str, Any]:
-        """計算訓練統計"""
+    def calculate_training_stats(
+        metrics_history: List[Dict], start_wall_time: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        計算訓練統計
+
+        Args:
+            metrics_history: 指標歷史 (TrainingCallbacks.metrics_history)
+            start_wall_time: 訓練起始牆鐘時間 (TrainingCallbacks.start_wall_time)，
+                用於由各輪 elapsed 推導起訖時間戳
+        """
         if not metrics_history:
             return {}
 
+        def entry_time(entry: Dict) -> str:
+            if "timestamp" in entry:
+                return entry["timestamp"]
+            if start_wall_time is None or "elapsed" not in entry:
+                return ""
+            return datetime.fromtimestamp(
+                start_wall_time + entry["elapsed"]
+            ).isoformat()
+
         stats = {
             "total_epochs": len(metrics_history),
-            "start_time": metrics_history[0].get("timestamp", ""),
-            "end_time": metrics_history[-1].get("timestamp", ""),
+            "start_time": entry_time(metrics_history[0]),
+            "end_time": entry_time(metrics_history[-1]),
+            # 以 log_metrics 記錄的單調秒數計算訓練耗時
+            "elapsed_seconds": float(metrics_history[-1].get("elapsed", 0.0)),
             "metrics_summary": {},
         }
 
-        # 計算每個指標的統計
-        all_metrics = {}
-        for entry in metrics_history:
-            for metric, value in entry["metrics"].items():
-                if metric not in all_metrics:
-                    all_metrics[metric] = []
-                all_metrics[metric].append(value)
-
-        for metric, values in all_metrics.items():
+        # 建立 (輪數, 指標數) 陣列，以向量化歸約計算各指標統計；
+        # 是否記錄以獨立遮罩表示，真實的 NaN (如損失發散) 會如實傳遞到統計結果
+        metric_names = list(
+            dict.fromkeys(
+                metric for entry in metrics_history for metric in entry["metrics"]
+            )
+        )
+        num_epochs, num_metrics = len(metrics_history), len(metric_names)
+        shape = (num_epochs, num_metrics)
+        present = np.fromiter(
+            (
+                metric in entry["metrics"]
+                for entry in metrics_history
+                for metric in metric_names
+            ),
+            dtype=bool,
+            count=num_epochs * num_metrics,
+        ).reshape(shape)
+        values = np.fromiter(
+            (
+                entry["metrics"].get(metric, 0.0)
+                for entry in metrics_history
+                for metric in metric_names
+            ),
+            dtype=np.float64,
+            count=num_epochs * num_metrics,
+        ).reshape(shape)
+
+        columns = np.arange(num_metrics)
+        firsts = values[present.argmax(axis=0), columns]
+        finals = values[num_epochs - 1 - present[::-1].argmax(axis=0), columns]
+        bests = np.where(present, values, -np.inf).max(axis=0)
+        worsts = np.where(present, values, np.inf).min(axis=0)
+        counts = present.sum(axis=0)
+        averages = np.where(present, values, 0.0).sum(axis=0) / counts
+
+        for i, metric in enumerate(metric_names):
             stats["metrics_summary"][metric] = {
-                "final": values[-1],
-                "best": max(values),
-                "worst": min(values),
-                "average": sum(values) / len(values),
-                "improvement": values[-1] - values[0] if len(values) > 1 else 0,
+                "final": float(finals[i]),
+                "best": float(bests[i]),
+                "worst": float(worsts[i]),
+                "average": float(averages[i]),
+                "improvement": float(finals[i] - firsts[i]) if counts[i] > 1 else 0,
             }
 
         return stats
@@ -153,13 +218,13 @@ class TrainingUtils:
         if not os.path.exists(checkpoint_dir):
             return
 
-        # 獲取所有檢查點文件
-        checkpoint_files = []
-        for file in os.listdir(checkpoint_dir):
-            if file.endswith(".pt"):
-                file_path = os.path.join(checkpoint_dir, file)
-                mtime = os.path.getmtime(file_path)
-                checkpoint_files.append((file_path, mtime))
+        # 獲取所有檢查點文件 (scandir 可重用目錄項的 stat 資訊)
+        with os.scandir(checkpoint_dir) as it:
+            checkpoint_files = [
+                (entry.path, entry.stat().st_mtime)
+                for entry in it
+                if entry.name.endswith(".pt") and entry.is_file()
+            ]
 
         # 按修改時間排序
         checkpoint_files.sort(key=lambda x: x[1], reverse=True)
@@ -168,9 +233,9 @@ class TrainingUtils:
         for file_path, _ in checkpoint_files[keep_last:]:
             try:
                 os.remove(file_path)
-                print(f"🗑️  已清理舊檢查點: {os.path.basename(file_path)}")
+                logger.info("🗑️  已清理舊檢查點: %s", os.path.basename(file_path))
             except Exception as e:
-                print(f"⚠️  清理檢查點失敗: {e}")
+                logger.warning("⚠️  清理檢查點失敗: %s", e)
 
     @staticmethod
     def validate_config(config: Dict[str, Any]) -> Tuple[bool, List[str]]:
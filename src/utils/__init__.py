@@ -1,9 +1,31 @@
 """
 通用工具模組
+
+使用 PEP 562 延遲載入：匯入本套件時不會立即載入 torch (gpu_manager)
+或 psutil (logger)，直到實際存取對應名稱時才匯入子模組。
 """
 
-from .file_manager import FileManager
-from .gpu_manager import GPUManager
-from .logger import get_logger, setup_logger
+import importlib
+from typing import Any
+
+_LAZY_ATTRS = {
+    "FileManager": ".file_manager",
+    "GPUManager": ".gpu_manager",
+    "get_logger": ".logger",
+    "setup_logger": ".logger",
+}
 
 __all__ = ["setup_logger", "get_logger", "GPUManager", "FileManager"]
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_ATTRS:
+        module = importlib.import_module(_LAZY_ATTRS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_ATTRS))
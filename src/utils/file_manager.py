@@ -3,16 +3,239 @@
 提供文件和目錄管理功能
 """
 
+import copy
+import fnmatch
 import hashlib
 import json
+import math
+import mmap
 import os
+import re
 import shutil
+import sys
+import tarfile
+import time
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
 import yaml
 
+try:
+    from blake3 import blake3
+
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    blake3 = None
+    BLAKE3_AVAILABLE = False
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+try:
+    import pyzstd
+
+    PYZSTD_AVAILABLE = True
+except ImportError:
+    pyzstd = None
+    PYZSTD_AVAILABLE = False
+
+# 優先使用 libyaml C 實作的 Loader/Dumper；輸出沿用完整 Dumper 以支援 Path、numpy 等物件
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_YAML_DUMPER = getattr(yaml, "CDumper", yaml.Dumper)
+
+# 配置文件解析快取：絕對路徑 → (mtime, size, 解析結果)，以 LRU 方式淘汰
+_CONFIG_CACHE_MAX_ENTRIES = 100
+_config_cache: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+
+# 校驗和計算：32 位元環境無法 mmap 超過 2GB 的文件，改以 1MB 分塊讀取
+_CHECKSUM_CHUNK_SIZE = 1024 * 1024
+_MMAP_MAX_SIZE = sys.maxsize if sys.maxsize > 2**32 else 2**31 - 1
+
+# 大於此大小的文件改用 copy_file_range 在核心內複製 (btrfs/XFS 可直接 reflink)
+_COPY_FILE_RANGE_MIN_SIZE = 16 * 1024 * 1024
+
+
+# 時間戳快取：(整數秒, 格式化字串)，以單一元組整體替換確保執行緒安全
+_ts_cache: Tuple[int, str] = (0, "")
+
+
+def create_timestamp() -> str:
+    """
+    創建秒級時間戳字符串
+
+    同一秒內重複呼叫直接回傳快取結果，省去 localtime 轉換與 strftime。
+    """
+    global _ts_cache
+    now = int(time.time())
+    cached = _ts_cache
+    if cached[0] != now:
+        cached = (now, datetime.fromtimestamp(now).strftime("%Y%m%d_%H%M%S"))
+        _ts_cache = cached
+    return cached[1]
+
+
+def _json_default(obj: Any) -> Any:
+    """將 numpy 數值/陣列與路徑轉換為 JSON 可表示的型別"""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if isinstance(obj, os.PathLike):
+        return os.fspath(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _contains_non_finite(data: Any) -> bool:
+    """檢查資料中是否含有 NaN/Inf (orjson 會將其寫為 null)"""
+    stack = [data]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, float):
+            if not math.isfinite(obj):
+                return True
+        elif isinstance(obj, dict):
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple)):
+            stack.extend(obj)
+        elif hasattr(obj, "dtype") and hasattr(obj, "tolist"):
+            stack.append(obj.tolist())
+    return False
+
+
+def write_json(data: Any, filepath: Union[str, Path]) -> None:
+    """
+    以 2 格縮排寫出 UTF-8 JSON 文件
+
+    安裝 orjson 時以其 C 實作直接寫出位元組；orjson 無法序列化的型別，
+    或輸出含 null 且確認來自 NaN/Inf (orjson 只能寫為 null) 時，改用標準庫 json。
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            payload = orjson.dumps(
+                data,
+                default=_json_default,
+                option=orjson.OPT_INDENT_2
+                | orjson.OPT_NON_STR_KEYS
+                | orjson.OPT_SERIALIZE_NUMPY,
+            )
+        except orjson.JSONEncodeError:
+            payload = None
+        # 只有輸出含 null 時才需檢查資料是否有 NaN/Inf
+        if payload is not None and (
+            b"null" not in payload or not _contains_non_finite(data)
+        ):
+            with open(filepath, "wb") as f:
+                f.write(payload)
+            return
+
+    with open(filepath, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False, default=_json_default)
+
+
+def _walk_stat(root: Union[str, Path]) -> Iterator[os.DirEntry]:
+    """
+    以 os.scandir 遞迴遍歷目錄 (不跟隨目錄符號連結)
+
+    DirEntry 會攜帶 readdir 已取得的類型資訊，省去 rglob 每項額外的 stat。
+    """
+    stack = [os.fspath(root)]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    yield entry
+        except OSError:
+            continue
+
+
+def _match_parts(part_res: List[Optional[re.Pattern]], parts: List[str]) -> bool:
+    """
+    以逐段編譯的模式比對路徑各段
+
+    part_res 中的 None 代表 "**"，可比對零或多段 (同 pathlib glob 的語意)。
+    """
+    if not part_res:
+        return not parts
+    head = part_res[0]
+    if head is None:
+        return any(_match_parts(part_res[1:], parts[i:]) for i in range(len(parts) + 1))
+    return (
+        bool(parts)
+        and head.match(parts[0]) is not None
+        and _match_parts(part_res[1:], parts[1:])
+    )
+
+
+def copy_without_cache(src: Union[str, Path], dst: Union[str, Path]) -> None:
+    """
+    複製文件後通知核心釋放來源與目標的頁快取
+
+    備份的 .pt 檔動輒數百 MB 且不會再讀取，避免其擠出訓練資料集的快取頁。
+    不支援 posix_fadvise 的平台 (如 Windows) 僅執行 copy2。
+    """
+    shutil.copy2(src, dst)
+    if not hasattr(os, "posix_fadvise"):
+        return
+
+    for path in (src, dst):
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def _copy_file_fast(src: str, dst: str) -> str:
+    """
+    copytree 使用的複製函式
+
+    大文件優先以 os.copy_file_range 複製；不支援時 (如跨檔案系統或非 Linux)
+    退回 shutil.copy2，其在 Linux 上會使用 sendfile，其餘平台為 copyfileobj。
+    """
+    if hasattr(os, "copy_file_range"):
+        try:
+            size = os.stat(src).st_size
+        except OSError:
+            size = 0
+        if size >= _COPY_FILE_RANGE_MIN_SIZE:
+            try:
+                with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                    in_fd, out_fd = fsrc.fileno(), fdst.fileno()
+                    while os.copy_file_range(in_fd, out_fd, _COPY_FILE_RANGE_MIN_SIZE):
+                        pass
+                shutil.copystat(src, dst)
+                return dst
+            except OSError:
+                pass
+    return shutil.copy2(src, dst)
+
+
+def _size_summary(total_size: int, file_count: int, dir_count: int) -> Dict[str, Any]:
+    """組成目錄大小信息"""
+    return {
+        "exists": True,
+        "total_size_bytes": total_size,
+        "total_size_mb": total_size / 1024**2,
+        "total_size_gb": total_size / 1024**3,
+        "file_count": file_count,
+        "directory_count": dir_count,
+    }
+
 
 class FileManager:
     """文件管理器"""
@@ -29,7 +252,7 @@ class FileManager:
 
     def create_timestamp(self) -> str:
         """創建時間戳字符串"""
-        return datetime.now().strftime("%Y%m%d_%H%M%S")
+        return create_timestamp()
 
     def create_project_structure(
         self, project_dir: Union[str, Path]
@@ -68,32 +291,55 @@ class FileManager:
         if format in ["yaml", "yml"]:
             with open(filepath, "w", encoding="utf-8") as f:
                 yaml.dump(
-                    config, f, default_flow_style=False, allow_unicode=True, indent=2
+                    config,
+                    f,
+                    Dumper=_YAML_DUMPER,
+                    default_flow_style=False,
+                    allow_unicode=True,
+                    indent=2,
                 )
         elif format == "json":
-            with open(filepath, "w", encoding="utf-8") as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+            write_json(config, filepath)
         else:
             raise ValueError(f"不支援的格式: {format}")
 
         return filepath
 
     def load_config(self, filepath: Union[str, Path]) -> Dict[str, Any]:
-        """載入配置文件"""
+        """
+        載入配置文件
+
+        解析結果以 (mtime, size) 驗證後快取，文件變更時自動重新解析；
+        回傳深拷貝，呼叫端可自由修改。
+        """
         filepath = Path(filepath)
 
         if not filepath.exists():
             raise FileNotFoundError(f"配置文件不存在: {filepath}")
 
         suffix = filepath.suffix.lower()
+        if suffix not in [".yaml", ".yml", ".json"]:
+            raise ValueError(f"不支援的配置文件格式: {suffix}")
+
+        stat = filepath.stat()
+        key = str(filepath.resolve())
+        cached = _config_cache.get(key)
+        if cached is not None and cached[:2] == (stat.st_mtime, stat.st_size):
+            _config_cache.move_to_end(key)
+            return copy.deepcopy(cached[2])
 
         with open(filepath, "r", encoding="utf-8") as f:
-            if suffix in [".yaml", ".yml"]:
-                return yaml.safe_load(f)
-            elif suffix == ".json":
-                return json.load(f)
+            if suffix == ".json":
+                config = json.load(f)
             else:
-                raise ValueError(f"不支援的配置文件格式: {suffix}")
+                config = yaml.load(f, Loader=_YAML_LOADER)
+
+        _config_cache[key] = (stat.st_mtime, stat.st_size, config)
+        _config_cache.move_to_end(key)
+        if len(_config_cache) > _CONFIG_CACHE_MAX_ENTRIES:
+            _config_cache.popitem(last=False)
+
+        return copy.deepcopy(config)
 
     def backup_file(
         self, filepath: Union[str, Path], backup_dir: Optional[Union[str, Path]] = None
@@ -111,11 +357,11 @@ class FileManager:
         self.ensure_dir(backup_dir)
 
         # 生成備份文件名
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = self.create_timestamp()
         backup_name = f"{filepath.stem}_{timestamp}{filepath.suffix}"
         backup_path = backup_dir / backup_name
 
-        shutil.copy2(filepath, backup_path)
+        copy_without_cache(filepath, backup_path)
         return backup_path
 
     def clean_directory(
@@ -139,23 +385,66 @@ class FileManager:
         if older_than_days is not None:
             from datetime import timedelta
 
-            time_threshold = datetime.now() - timedelta(days=older_than_days)
-
-        for pattern in patterns:
-            for filepath in directory.rglob(pattern):
+            time_threshold = (
+                datetime.now() - timedelta(days=older_than_days)
+            ).timestamp()
+
+        # 預先編譯所有模式，單次遍歷即可比對全部模式；單段模式只比對名稱，
+        # 含 "/" 或 "**" 的模式逐段編譯，如 rglob 般以隱含的 "**/" 前綴比對相對路徑
+        name_res: Dict[int, re.Pattern] = {}
+        path_res: Dict[int, List[Optional[re.Pattern]]] = {}
+        for index, pattern in enumerate(patterns):
+            parts = [part for part in pattern.split("/") if part]
+            if len(parts) == 1 and parts[0] != "**":
+                name_res[index] = re.compile(fnmatch.translate(parts[0]))
+            elif parts:
+                path_res[index] = [None] + [
+                    None if part == "**" else re.compile(fnmatch.translate(part))
+                    for part in parts
+                ]
+
+        # 依模式分組收集符合項目，刪除延後到遍歷結束後進行
+        matches: List[List[os.DirEntry]] = [[] for _ in patterns]
+        for entry in _walk_stat(directory):
+            rel_parts = None
+            for index, regex in name_res.items():
+                if regex.match(entry.name):
+                    matches[index].append(entry)
+            for index, part_res in path_res.items():
+                if rel_parts is None:
+                    rel_parts = os.path.relpath(entry.path, directory).split(os.sep)
+                if _match_parts(part_res, rel_parts):
+                    matches[index].append(entry)
+
+        # 與逐一模式 rglob 相同：依模式順序刪除，已隨上層目錄刪除的項目略過
+        root = os.fspath(directory)
+        removed_paths = set()
+
+        def already_removed(path: str) -> bool:
+            while path != root and len(path) > len(root):
+                if path in removed_paths:
+                    return True
+                path = os.path.dirname(path)
+            return False
+
+        for entries in matches:
+            for entry in entries:
+                if already_removed(entry.path):
+                    continue
                 try:
                     # 檢查文件年齡
                     if time_threshold is not None:
-                        file_time = datetime.fromtimestamp(filepath.stat().st_mtime)
-                        if file_time > time_threshold:
+                        if entry.stat().st_mtime > time_threshold:
                             continue
 
-                    if filepath.is_file():
-                        filepath.unlink()
-                        removed_files.append(filepath)
-                    elif filepath.is_dir():
-                        shutil.rmtree(filepath)
-                        removed_files.append(filepath)
+                    if entry.is_file():
+                        os.unlink(entry.path)
+                    elif entry.is_dir():
+                        shutil.rmtree(entry.path)
+                    else:
+                        continue
+                    removed_paths.add(entry.path)
+                    removed_files.append(Path(entry.path))
 
                 except OSError:
                     pass  # 忽略無法刪除的文件
@@ -173,24 +462,17 @@ class FileManager:
         file_count = 0
         dir_count = 0
 
-        for item in directory.rglob("*"):
-            if item.is_file():
+        for entry in _walk_stat(directory):
+            if entry.is_dir(follow_symlinks=False):
+                dir_count += 1
+            elif entry.is_file():
                 try:
-                    total_size += item.stat().st_size
+                    total_size += entry.stat().st_size
                     file_count += 1
                 except OSError:
                     pass
-            elif item.is_dir():
-                dir_count += 1
 
-        return {
-            "exists": True,
-            "total_size_bytes": total_size,
-            "total_size_mb": total_size / 1024**2,
-            "total_size_gb": total_size / 1024**3,
-            "file_count": file_count,
-            "directory_count": dir_count,
-        }
+        return _size_summary(total_size, file_count, dir_count)
 
     def find_files(
         self, directory: Union[str, Path], pattern: str = "*", recursive: bool = True
@@ -222,7 +504,7 @@ class FileManager:
         if dst.exists() and overwrite:
             shutil.rmtree(dst)
 
-        shutil.copytree(src, dst)
+        shutil.copytree(src, dst, copy_function=_copy_file_fast)
         return dst
 
     def create_symlink(self, src: Union[str, Path], dst: Union[str, Path]) -> Path:
@@ -247,19 +529,44 @@ class FileManager:
             return dst
 
     def calculate_checksum(
-        self, filepath: Union[str, Path], algorithm: str = "md5"
+        self, filepath: Union[str, Path], algorithm: str = "blake3"
+    ) -> str:
+        """
+        計算文件校驗和
+
+        預設使用 BLAKE3 (SIMD 與多執行緒樹狀雜湊)；未安裝 blake3 時退回 sha256。
+        hashlib 演算法以 mmap 將整個文件一次交給其 C 實作處理，
+        sha256 可使用 CPU 的 SHA 指令集加速。
+        """
+        return self._checksum(filepath, algorithm, multithreaded=True)
+
+    def _checksum(
+        self, filepath: Union[str, Path], algorithm: str, multithreaded: bool
     ) -> str:
-        """計算文件校驗和"""
+        """計算文件校驗和；已在執行緒池中並行時以單執行緒 BLAKE3 避免超額訂閱 CPU"""
         filepath = Path(filepath)
 
         if not filepath.exists():
             raise FileNotFoundError(f"文件不存在: {filepath}")
 
+        if algorithm == "blake3":
+            if BLAKE3_AVAILABLE:
+                hasher = blake3(max_threads=blake3.AUTO if multithreaded else 1)
+                hasher.update_mmap(filepath)
+                return hasher.hexdigest()
+            algorithm = "sha256"
+
         hash_obj = hashlib.new(algorithm)
 
         with open(filepath, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_obj.update(chunk)
+            size = os.fstat(f.fileno()).st_size
+            # 空文件無法 mmap，直接回傳空內容的校驗和
+            if 0 < size <= _MMAP_MAX_SIZE:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    hash_obj.update(mm)
+            elif size > _MMAP_MAX_SIZE:
+                for chunk in iter(lambda: f.read(_CHECKSUM_CHUNK_SIZE), b""):
+                    hash_obj.update(chunk)
 
         return hash_obj.hexdigest()
 
@@ -269,7 +576,12 @@ class FileManager:
         output_file: Union[str, Path],
         format: str = "zip",
     ) -> Path:
-        """壓縮目錄"""
+        """
+        壓縮目錄
+
+        zip 以 deflate 等級 1 壓縮 (速度約為預設等級 6 的 3 倍，體積僅大約 10%)；
+        zstd 需安裝 pyzstd，以多執行緒壓縮為 .tar.zst。
+        """
         directory = Path(directory)
         output_file = Path(output_file)
 
@@ -281,12 +593,30 @@ class FileManager:
         # 移除副檔名以讓 shutil 自動添加
         base_name = str(output_file.with_suffix(""))
 
+        if format == "zip":
+            archive_path = Path(f"{base_name}.zip")
+            with zipfile.ZipFile(
+                archive_path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1
+            ) as zf:
+                for entry in _walk_stat(directory):
+                    if entry.is_dir(follow_symlinks=False) or entry.is_file():
+                        zf.write(entry.path, os.path.relpath(entry.path, directory))
+            return archive_path
+
+        if format == "zstd":
+            if not PYZSTD_AVAILABLE:
+                raise ImportError("zstd 格式需要安裝 pyzstd: pip install pyzstd")
+            archive_path = Path(f"{base_name}.tar.zst")
+            option = {pyzstd.CParameter.nbWorkers: os.cpu_count() or 1}
+            with pyzstd.ZstdFile(archive_path, "w", level_or_option=option) as zf:
+                with tarfile.open(fileobj=zf, mode="w|") as tf:
+                    tf.add(str(directory), arcname=".")
+            return archive_path
+
         shutil.make_archive(base_name, format, directory)
 
         # 返回實際創建的文件路徑
-        if format == "zip":
-            return Path(f"{base_name}.zip")
-        elif format == "tar":
+        if format == "tar":
             return Path(f"{base_name}.tar")
         elif format == "gztar":
             return Path(f"{base_name}.tar.gz")
@@ -305,6 +635,22 @@ class FileManager:
 
         self.ensure_dir(extract_to)
 
+        # shutil.unpack_archive 不支援 .tar.zst
+        if archive_file.name.endswith(".tar.zst"):
+            if not PYZSTD_AVAILABLE:
+                raise ImportError("zstd 格式需要安裝 pyzstd: pip install pyzstd")
+            with pyzstd.ZstdFile(archive_file, "r") as zf:
+                with tarfile.open(fileobj=zf, mode="r|") as tf:
+                    if hasattr(tarfile, "data_filter"):
+                        tf.extractall(extract_to, filter="data")
+                    else:
+                        # 舊版 Python 無解壓過濾器：逐一檢查成員路徑後再解壓
+                        root = os.path.realpath(extract_to)
+                        for member in tf:
+                            _check_tar_member(member, root)
+                            tf.extract(member, extract_to)
+            return extract_to
+
         shutil.unpack_archive(archive_file, extract_to)
         return extract_to
 
@@ -315,26 +661,49 @@ class FileManager:
         if not directory.exists():
             raise FileNotFoundError(f"目錄不存在: {directory}")
 
-        manifest = {
-            "created_at": datetime.now().isoformat(),
-            "directory": str(directory),
-            "total_size": self.get_directory_size(directory),
-            "files": [],
-        }
+        created_at = datetime.now().isoformat()
 
-        for filepath in directory.rglob("*"):
-            if filepath.is_file():
+        # 單次遍歷同時統計目錄大小並收集文件 stat
+        entries: List[Tuple[str, os.stat_result]] = []
+        total_size = 0
+        dir_count = 0
+        for entry in _walk_stat(directory):
+            if entry.is_dir(follow_symlinks=False):
+                dir_count += 1
+            elif entry.is_file():
                 try:
-                    stat = filepath.stat()
-                    file_info = {
-                        "path": str(filepath.relative_to(directory)),
-                        "size": stat.st_size,
-                        "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                        "checksum": self.calculate_checksum(filepath),
-                    }
-                    manifest["files"].append(file_info)
+                    stat = entry.stat()
                 except OSError:
-                    pass
+                    continue
+                total_size += stat.st_size
+                entries.append((entry.path, stat))
+
+        # 以執行緒池並行計算校驗和 (雜湊計算時會釋放 GIL)；各文件改用單執行緒 BLAKE3，
+        # 避免每個工作執行緒再各自啟動多執行緒雜湊而超額訂閱 CPU
+        def describe(item: Tuple[str, os.stat_result]) -> Optional[Dict[str, Any]]:
+            path, stat = item
+            try:
+                checksum = self._checksum(path, "blake3", multithreaded=False)
+            except OSError:
+                return None
+            return {
+                "path": os.path.relpath(path, directory),
+                "size": stat.st_size,
+                "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                "checksum": checksum,
+            }
+
+        max_workers = min(32, (os.cpu_count() or 1) + 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            files = [info for info in executor.map(describe, entries) if info]
+
+        manifest = {
+            "created_at": created_at,
+            "directory": str(directory),
+            "checksum_algorithm": "blake3" if BLAKE3_AVAILABLE else "sha256",
+            "total_size": _size_summary(total_size, len(entries), dir_count),
+            "files": files,
+        }
 
         return manifest
 
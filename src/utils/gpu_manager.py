@@ -3,22 +3,232 @@ GPU 管理模組
 提供GPU檢測、配置和優化功能
 """
 
-import json
+import atexit
+import heapq
+import math
 import os
 import subprocess
+import sys
+import time
+from functools import cached_property
+from operator import attrgetter
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
 
 import torch
 
+from .file_manager import write_json
+
+try:
+    import pynvml
+
+    PYNVML_AVAILABLE = True
+except ImportError:
+    pynvml = None
+    PYNVML_AVAILABLE = False
+
+# 位元組 → GB 的換算係數
+_INV_GB = 1.0 / (1 << 30)
+
+_nvml_initialized = False
+
+
+def _init_nvml() -> bool:
+    """初始化 NVML (每個進程一次，並於結束時關閉)"""
+    global _nvml_initialized
+    if not PYNVML_AVAILABLE:
+        return False
+
+    if not _nvml_initialized:
+        try:
+            pynvml.nvmlInit()
+        except pynvml.NVMLError:
+            return False
+        atexit.register(pynvml.nvmlShutdown)
+        _nvml_initialized = True
+
+    return True
+
+
+# 使用者自訂 PyTorch 分配器設定的環境變數 (PYTORCH_ALLOC_CONF 為新版名稱)
+_ALLOC_CONF_ENV_VARS = ("PYTORCH_CUDA_ALLOC_CONF", "PYTORCH_ALLOC_CONF")
+
+
+def configure_cuda_allocator() -> None:
+    """
+    讓 PyTorch 使用 CUDA 的 stream-ordered 記憶體池 (cudaMallocAsync)
+
+    須在首次 CUDA 呼叫前執行才會生效；使用者已設定 PYTORCH_CUDA_ALLOC_CONF
+    (或新版的 PYTORCH_ALLOC_CONF) 時不做任何變更。cudaMallocAsync 後端需 CUDA 11.4+，
+    較舊的執行環境會在首次配置時失敗，因此不啟用。
+    CUDA 已初始化時改為對原生分配器啟用 expandable_segments，以減少碎片化造成的 OOM。
+    """
+    if any(name in os.environ for name in _ALLOC_CONF_ENV_VARS):
+        return
+    if not torch.version.cuda:
+        return
+
+    try:
+        cuda_version = tuple(int(part) for part in torch.version.cuda.split(".")[:2])
+    except ValueError:
+        return
+    if cuda_version < (11, 4):
+        return
+
+    if not torch.cuda.is_initialized():
+        os.environ["PYTORCH_CUDA_ALLOC_CONF"] = "backend:cudaMallocAsync"
+        return
+
+    set_allocator_settings = getattr(torch.cuda.memory, "_set_allocator_settings", None)
+    if set_allocator_settings is not None:
+        try:
+            set_allocator_settings("expandable_segments:True")
+        except RuntimeError:
+            pass
+
+
+class GPUInfo:
+    """單一GPU的屬性與記憶體快照 (衍生欄位於存取時計算)"""
+
+    __slots__ = (
+        "id",
+        "name",
+        "total_memory",
+        "major",
+        "minor",
+        "multi_processor_count",
+        "allocated_memory",
+        "reserved_memory",
+        "available",
+        "error",
+    )
+
+    def __init__(
+        self,
+        id: int,
+        name: str,
+        total_memory: int = 0,
+        major: int = 0,
+        minor: int = 0,
+        multi_processor_count: int = 0,
+        allocated_memory: int = 0,
+        reserved_memory: int = 0,
+        available: bool = True,
+        error: Optional[str] = None,
+    ):
+        self.id = id
+        self.name = name
+        self.total_memory = total_memory
+        self.major = major
+        self.minor = minor
+        self.multi_processor_count = multi_processor_count
+        self.allocated_memory = allocated_memory
+        self.reserved_memory = reserved_memory
+        self.available = available
+        self.error = error
+
+    @property
+    def total_memory_gb(self) -> float:
+        return self.total_memory * _INV_GB
+
+    @property
+    def allocated_memory_gb(self) -> float:
+        return self.allocated_memory * _INV_GB
+
+    @property
+    def reserved_memory_gb(self) -> float:
+        return self.reserved_memory * _INV_GB
+
+    @property
+    def free_memory(self) -> int:
+        return self.total_memory - self.allocated_memory
+
+    @property
+    def free_memory_gb(self) -> float:
+        return self.free_memory * _INV_GB
+
+    @property
+    def utilization(self) -> float:
+        if not self.total_memory:
+            return 0.0
+        return self.allocated_memory / self.total_memory * 100
+
+    def to_dict(self) -> Dict[str, Any]:
+        """轉換為報告用的字典 (不可用的GPU僅包含錯誤信息)"""
+        if not self.available:
+            return {
+                "id": self.id,
+                "name": self.name,
+                "error": self.error,
+                "available": False,
+            }
+
+        return {
+            "id": self.id,
+            "name": self.name,
+            "total_memory": self.total_memory,
+            "total_memory_gb": self.total_memory_gb,
+            "major": self.major,
+            "minor": self.minor,
+            "multi_processor_count": self.multi_processor_count,
+            "available": True,
+            "allocated_memory": self.allocated_memory,
+            "allocated_memory_gb": self.allocated_memory_gb,
+            "reserved_memory": self.reserved_memory,
+            "reserved_memory_gb": self.reserved_memory_gb,
+            "free_memory": self.free_memory,
+            "free_memory_gb": self.free_memory_gb,
+            "utilization": self.utilization,
+        }
+
 
 class GPUManager:
-    """GPU 管理器"""
+    """
+    GPU 管理器
+
+    硬體資訊皆於首次存取時才偵測：get_device() 只需 CUDA 可用性與GPU數量，
+    print_gpu_info()、save_gpu_report() 等使用 gpu_info 的方法才會建立 CUDA context
+    並查詢各GPU記憶體。
+
+    nvidia-smi 即時信息快取 _SMI_CACHE_TTL 秒，最佳設備配置快取至 invalidate() 為止。
+    """
+
+    _SMI_CACHE_TTL = 1.0
 
     def __init__(self):
-        self.cuda_available = torch.cuda.is_available()
-        self.gpu_count = torch.cuda.device_count() if self.cuda_available else 0
-        self.gpu_info = self._get_gpu_info() if self.cuda_available else []
+        self._smi_cache: Tuple[float, Optional[Dict[str, Any]]] = (-math.inf, None)
+        self._optimal_cache: Dict[FrozenSet[int], Dict[str, Any]] = {}
+
+    def invalidate(self) -> None:
+        """清除記憶體快照與查詢快取 (清理記憶體或訓練階段結束後呼叫)"""
+        self.__dict__.pop("gpu_info", None)
+        self._smi_cache = (-math.inf, None)
+        self._optimal_cache.clear()
+
+    @cached_property
+    def cuda_available(self) -> bool:
+        """CUDA 是否可用"""
+        return torch.cuda.is_available()
+
+    @cached_property
+    def gpu_count(self) -> int:
+        """GPU 數量"""
+        return torch.cuda.device_count() if self.cuda_available else 0
+
+    @cached_property
+    def gpu_info(self) -> List[GPUInfo]:
+        """GPU 詳細信息 (首次存取時的記憶體快照)"""
+        return self._get_gpu_info() if self.cuda_available else []
+
+    @cached_property
+    def _props(self) -> List[Any]:
+        """各GPU的裝置屬性 (進程內不變，只查詢一次)"""
+        return self._get_device_properties()
+
+    @cached_property
+    def _nvml_handles(self) -> Optional[List[Any]]:
+        """各GPU的 NVML 句柄"""
+        return self._get_nvml_handles()
 
     def get_device(self) -> str:
         """獲取推薦的設備字符串"""
@@ -28,52 +238,83 @@ class GPUManager:
         else:
             return "cpu"
 
-    def _get_gpu_info(self) -> List[Dict[str, Any]]:
-        """獲取GPU詳細信息"""
-        gpu_info = []
-
+    def _get_device_properties(self) -> List[Any]:
+        """查詢各GPU的裝置屬性，查詢失敗的裝置以例外物件佔位"""
+        props = []
         for i in range(self.gpu_count):
             try:
-                props = torch.cuda.get_device_properties(i)
-                info = {
-                    "id": i,
-                    "name": props.name,
-                    "total_memory": props.total_memory,
-                    "total_memory_gb": props.total_memory / 1024**3,
-                    "major": props.major,
-                    "minor": props.minor,
-                    "multi_processor_count": props.multi_processor_count,
-                    "available": True,
-                }
+                props.append(torch.cuda.get_device_properties(i))
+            except Exception as e:
+                props.append(e)
+        return props
 
-                # 獲取當前記憶體使用情況
-                torch.cuda.set_device(i)
-                allocated = torch.cuda.memory_allocated(i)
-                reserved = torch.cuda.memory_reserved(i)
+    def _device_props(self, device_id: int) -> Any:
+        """取得快取的裝置屬性，查詢失敗時重新拋出原始例外"""
+        props = self._props[device_id]
+        if isinstance(props, Exception):
+            raise props
+        return props
 
-                info.update(
-                    {
-                        "allocated_memory": allocated,
-                        "allocated_memory_gb": allocated / 1024**3,
-                        "reserved_memory": reserved,
-                        "reserved_memory_gb": reserved / 1024**3,
-                        "free_memory": props.total_memory - allocated,
-                        "free_memory_gb": (props.total_memory - allocated) / 1024**3,
-                        "utilization": allocated / props.total_memory * 100,
-                    }
-                )
+    def _get_gpu_info(self) -> List[GPUInfo]:
+        """獲取GPU詳細信息"""
+        return [self._probe_device(i) for i in range(self.gpu_count)]
 
-                gpu_info.append(info)
+    def _probe_device(self, i: int) -> GPUInfo:
+        """查詢單一GPU的屬性與記憶體使用情況"""
+        try:
+            props = self._device_props(i)
+            # 查詢函式接受裝置索引，無需切換裝置
+            return GPUInfo(
+                id=i,
+                name=props.name,
+                total_memory=props.total_memory,
+                major=props.major,
+                minor=props.minor,
+                multi_processor_count=props.multi_processor_count,
+                allocated_memory=torch.cuda.memory_allocated(i),
+                reserved_memory=torch.cuda.memory_reserved(i),
+            )
 
-            except Exception as e:
-                gpu_info.append(
-                    {"id": i, "name": "Unknown", "error": str(e), "available": False}
-                )
+        except Exception as e:
+            return GPUInfo(id=i, name="Unknown", available=False, error=str(e))
 
-        return gpu_info
+    def _get_nvml_handles(self) -> Optional[List[Any]]:
+        """取得所有GPU的 NVML 句柄，NVML 不可用時回傳 None"""
+        if not _init_nvml():
+            return None
+
+        try:
+            return [
+                pynvml.nvmlDeviceGetHandleByIndex(i)
+                for i in range(pynvml.nvmlDeviceGetCount())
+            ]
+        except pynvml.NVMLError:
+            return None
 
     def get_nvidia_smi_info(self) -> Optional[Dict[str, Any]]:
-        """通過 nvidia-smi 獲取GPU信息"""
+        """
+        獲取 nvidia-smi 等效的GPU即時信息
+
+        優先以 NVML 在進程內查詢；未安裝 pynvml 或查詢失敗時才啟動 nvidia-smi 子進程。
+        結果快取 _SMI_CACHE_TTL 秒。
+        """
+        timestamp, cached = self._smi_cache
+        now = time.monotonic()
+        if now - timestamp < self._SMI_CACHE_TTL:
+            return cached
+
+        smi_info = self._query_smi()
+        self._smi_cache = (now, smi_info)
+        return smi_info
+
+    def _query_smi(self) -> Optional[Dict[str, Any]]:
+        """查詢GPU即時信息 (NVML 或 nvidia-smi 子進程)"""
+        if self._nvml_handles is not None:
+            try:
+                return {"gpus": self._query_nvml(), "available": True}
+            except pynvml.NVMLError:
+                pass
+
         try:
             result = subprocess.run(
                 [
@@ -108,45 +349,85 @@ class GPUManager:
         except (subprocess.CalledProcessError, FileNotFoundError, ValueError):
             return None
 
+    def _query_nvml(self) -> List[Dict[str, Any]]:
+        """以 NVML 查詢各GPU的記憶體與使用率 (欄位與 nvidia-smi 輸出一致)"""
+        smi_info = []
+
+        for index, handle in enumerate(self._nvml_handles):
+            name = pynvml.nvmlDeviceGetName(handle)
+            if isinstance(name, bytes):
+                name = name.decode("utf-8")
+            memory = pynvml.nvmlDeviceGetMemoryInfo(handle)
+            utilization = pynvml.nvmlDeviceGetUtilizationRates(handle)
+
+            smi_info.append(
+                {
+                    "index": index,
+                    "name": name,
+                    "memory_total_mb": memory.total // 1024**2,
+                    "memory_used_mb": memory.used // 1024**2,
+                    "memory_free_mb": memory.free // 1024**2,
+                    "utilization_percent": utilization.gpu,
+                }
+            )
+
+        return smi_info
+
     def print_gpu_info(self):
-        """打印GPU信息"""
-        print("=== GPU 信息 ===")
+        """打印GPU信息 (整份報告組成單一字串後一次寫出)"""
+        lines = ["=== GPU 信息 ==="]
 
         if not self.cuda_available:
-            print("❌ CUDA 不可用")
-            return
-
-        print(f"✅ CUDA 可用，檢測到 {self.gpu_count} 個GPU")
-
-        for gpu in self.gpu_info:
-            if gpu.get("available", False):
-                print(f"\n🔹 GPU {gpu['id']}: {gpu['name']}")
-                print(f"   總記憶體: {gpu['total_memory_gb']:.1f} GB")
-                print(f"   已分配: {gpu['allocated_memory_gb']:.2f} GB")
-                print(f"   已保留: {gpu['reserved_memory_gb']:.2f} GB")
-                print(f"   可用: {gpu['free_memory_gb']:.2f} GB")
-                print(f"   使用率: {gpu['utilization']:.1f}%")
-                print(f"   計算能力: {gpu['major']}.{gpu['minor']}")
-                print(f"   多處理器: {gpu['multi_processor_count']}")
-            else:
-                print(f"\n❌ GPU {gpu['id']}: 不可用")
-                if "error" in gpu:
-                    print(f"   錯誤: {gpu['error']}")
-
-        # nvidia-smi 信息
-        smi_info = self.get_nvidia_smi_info()
-        if smi_info:
-            print(f"\n📊 nvidia-smi 即時狀態:")
-            for gpu in smi_info["gpus"]:
-                print(
+            lines.append("❌ CUDA 不可用")
+        else:
+            lines.append(f"✅ CUDA 可用，檢測到 {self.gpu_count} 個GPU")
+
+            for gpu in self.gpu_info:
+                if gpu.available:
+                    lines += [
+                        f"\n🔹 GPU {gpu.id}: {gpu.name}",
+                        f"   總記憶體: {gpu.total_memory_gb:.1f} GB",
+                        f"   已分配: {gpu.allocated_memory_gb:.2f} GB",
+                        f"   已保留: {gpu.reserved_memory_gb:.2f} GB",
+                        f"   可用: {gpu.free_memory_gb:.2f} GB",
+                        f"   使用率: {gpu.utilization:.1f}%",
+                        f"   計算能力: {gpu.major}.{gpu.minor}",
+                        f"   多處理器: {gpu.multi_processor_count}",
+                    ]
+                else:
+                    lines.append(f"\n❌ GPU {gpu.id}: 不可用")
+                    if gpu.error is not None:
+                        lines.append(f"   錯誤: {gpu.error}")
+
+            # nvidia-smi 信息
+            smi_info = self.get_nvidia_smi_info()
+            if smi_info:
+                lines.append("\n📊 nvidia-smi 即時狀態:")
+                lines += [
                     f"   GPU {gpu['index']}: {gpu['utilization_percent']}% 使用率, "
                     f"{gpu['memory_used_mb']}/{gpu['memory_total_mb']} MB 記憶體"
-                )
+                    for gpu in smi_info["gpus"]
+                ]
+
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
 
     def get_optimal_device_setup(
         self, preferred_gpus: Optional[List[int]] = None
     ) -> Dict[str, Any]:
-        """獲取最佳設備配置"""
+        """獲取最佳設備配置 (依優先GPU組合快取，回傳副本以免呼叫端修改快取)"""
+        key = frozenset(preferred_gpus or ())
+        config = self._optimal_cache.get(key)
+        if config is None:
+            config = self._optimal_cache[key] = self._compute_optimal_device_setup(
+                preferred_gpus
+            )
+        return dict(config, device_ids=list(config["device_ids"]))
+
+    def _compute_optimal_device_setup(
+        self, preferred_gpus: Optional[List[int]]
+    ) -> Dict[str, Any]:
+        """依目前的GPU信息計算最佳設備配置"""
         config = {
             "use_multi_gpu": False,
             "device_ids": [0],
@@ -160,7 +441,7 @@ class GPUManager:
             return config
 
         # 篩選可用GPU
-        available_gpus = [gpu for gpu in self.gpu_info if gpu.get("available", False)]
+        available_gpus = [gpu for gpu in self.gpu_info if gpu.available]
 
         if not available_gpus:
             config["strategy"] = "cpu"
@@ -169,39 +450,39 @@ class GPUManager:
         # 如果指定了優先GPU，先檢查可用性
         if preferred_gpus:
             valid_preferred = [
-                gpu for gpu in available_gpus if gpu["id"] in preferred_gpus
+                gpu for gpu in available_gpus if gpu.id in preferred_gpus
             ]
             if valid_preferred:
                 available_gpus = valid_preferred
 
-        # 按記憶體大小排序
-        available_gpus.sort(key=lambda x: x["free_memory_gb"], reverse=True)
+        # 取可用記憶體最多的兩個GPU (不需完整排序)
+        top_gpus = heapq.nlargest(2, available_gpus, key=attrgetter("free_memory_gb"))
 
         # 單GPU配置
-        best_gpu = available_gpus[0]
+        best_gpu = top_gpus[0]
         config.update(
             {
                 "strategy": "single-gpu",
-                "device_ids": [best_gpu["id"]],
-                "available_memory_gb": best_gpu["free_memory_gb"],
+                "device_ids": [best_gpu.id],
+                "available_memory_gb": best_gpu.free_memory_gb,
                 "recommended_batch_multiplier": 1,
             }
         )
 
         # 多GPU配置檢查
-        if len(available_gpus) >= 2:
+        if len(top_gpus) >= 2:
             # 檢查前兩個GPU是否記憶體相近
-            gpu1, gpu2 = available_gpus[0], available_gpus[1]
-            memory_diff = abs(gpu1["total_memory_gb"] - gpu2["total_memory_gb"])
+            gpu1, gpu2 = top_gpus
+            memory_diff = abs(gpu1.total_memory_gb - gpu2.total_memory_gb)
 
             if memory_diff < 2.0:  # 記憶體差異小於2GB
                 config.update(
                     {
                         "use_multi_gpu": True,
                         "strategy": "multi-gpu",
-                        "device_ids": [gpu1["id"], gpu2["id"]],
+                        "device_ids": [gpu1.id, gpu2.id],
                         "available_memory_gb": min(
-                            gpu1["free_memory_gb"], gpu2["free_memory_gb"]
+                            gpu1.free_memory_gb, gpu2.free_memory_gb
                         ),
                         "recommended_batch_multiplier": 2,
                     }
@@ -209,11 +490,22 @@ class GPUManager:
 
         return config
 
-    def setup_cuda_environment(self, device_ids: List[int]) -> bool:
-        """設置CUDA環境"""
+    def setup_cuda_environment(
+        self, device_ids: List[int], reserve_fraction: float = 0.0
+    ) -> bool:
+        """
+        設置CUDA環境
+
+        Args:
+            device_ids: 使用的 GPU 編號
+            reserve_fraction: 預先保留於 PyTorch 記憶體池的可用記憶體比例；
+                預設 0 不預留，僅在單一進程獨佔 GPU 時才建議開啟
+        """
         if not self.cuda_available:
             return False
 
+        configure_cuda_allocator()
+
         try:
             # 設置可見GPU
             os.environ["CUDA_VISIBLE_DEVICES"] = ",".join(map(str, device_ids))
@@ -222,10 +514,7 @@ class GPUManager:
             for device_id in device_ids:
                 if device_id < self.gpu_count:
                     torch.cuda.set_device(device_id)
-                    # 簡單的記憶體測試
-                    test_tensor = torch.rand(100, 100).cuda()
-                    del test_tensor
-                    torch.cuda.empty_cache()
+                    self._warmup_device(device_id, reserve_fraction)
 
             return True
 
@@ -233,50 +522,76 @@ class GPUManager:
             print(f"❌ CUDA環境設置失敗: {e}")
             return False
 
+    def _warmup_device(self, device_id: int, reserve_fraction: float = 0.0) -> None:
+        """
+        初始化 cuBLAS，並可選擇預先擴充快取分配器的記憶體池
+
+        reserve_fraction > 0 時依 mem_get_info() 目前可用記憶體配置一塊區段再釋放回
+        PyTorch 記憶體池，之後的訓練配置直接由池中切分；此區段在進程結束前不會歸還，
+        因此預設關閉，避免佔用其他進程與 DDP worker 的記憶體。
+        """
+        if reserve_fraction > 0:
+            free_bytes, _ = torch.cuda.mem_get_info(device_id)
+            try:
+                block = torch.empty(
+                    int(free_bytes * reserve_fraction),
+                    dtype=torch.uint8,
+                    device=device_id,
+                )
+                # 刻意不呼叫 empty_cache：釋放的區段留在池中供後續配置重用
+                del block
+            except RuntimeError:
+                # 記憶體不足時放棄預留，僅執行 cuBLAS 預熱
+                pass
+
+        a = torch.randn(64, 64, device=device_id)
+        (a @ a).sum().item()
+
     def clear_gpu_memory(self, device_ids: Optional[List[int]] = None):
-        """清理GPU記憶體"""
+        """
+        清理GPU記憶體
+
+        empty_cache 會一次釋放所有已初始化裝置的快取區段，不需逐一切換當前裝置；
+        device_ids 僅保留作為相容參數。
+        """
         if not self.cuda_available:
             return
 
-        if device_ids is None:
-            device_ids = list(range(self.gpu_count))
+        try:
+            torch.cuda.empty_cache()
+        except Exception as e:
+            print(f"⚠️  清理GPU記憶體失敗: {e}")
 
-        for device_id in device_ids:
-            try:
-                torch.cuda.set_device(device_id)
-                torch.cuda.empty_cache()
-            except Exception as e:
-                print(f"⚠️  清理GPU {device_id} 記憶體失敗: {e}")
+        self.invalidate()
 
     def monitor_gpu_usage(self) -> Dict[str, Any]:
         """監控GPU使用情況"""
         if not self.cuda_available:
             return {"available": False}
 
-        usage_info = {"available": True, "gpus": []}
-
-        for i in range(self.gpu_count):
-            try:
-                torch.cuda.set_device(i)
-                allocated = torch.cuda.memory_allocated(i)
-                reserved = torch.cuda.memory_reserved(i)
-                total = torch.cuda.get_device_properties(i).total_memory
-
-                gpu_usage = {
-                    "id": i,
-                    "allocated_gb": allocated / 1024**3,
-                    "reserved_gb": reserved / 1024**3,
-                    "total_gb": total / 1024**3,
-                    "free_gb": (total - allocated) / 1024**3,
-                    "utilization_percent": allocated / total * 100,
-                }
-
-                usage_info["gpus"].append(gpu_usage)
+        return {
+            "available": True,
+            "gpus": [self._device_usage(i) for i in range(self.gpu_count)],
+        }
 
-            except Exception as e:
-                usage_info["gpus"].append({"id": i, "error": str(e)})
+    def _device_usage(self, i: int) -> Dict[str, Any]:
+        """查詢單一GPU的即時記憶體使用情況"""
+        try:
+            allocated = torch.cuda.memory_allocated(i)
+            reserved = torch.cuda.memory_reserved(i)
+            total = self._device_props(i).total_memory
+
+            return {
+                "id": i,
+                "allocated_gb": allocated * _INV_GB,
+                "reserved_gb": reserved * _INV_GB,
+                "total_gb": total * _INV_GB,
+                "free_gb": (total - allocated) * _INV_GB,
+                "utilization_percent": allocated / total * 100,
+            }
 
-        return usage_info
+        except Exception as e:
+            return {"id": i, "error": str(e)}
 
     def get_recommended_batch_size(
         self, model_size: str, img_size: int, device_ids: List[int]
@@ -307,7 +622,7 @@ class GPUManager:
             # 單GPU，檢查記憶體
             if device_ids[0] < len(self.gpu_info):
                 gpu = self.gpu_info[device_ids[0]]
-                memory_gb = gpu.get("free_memory_gb", 8)
+                memory_gb = gpu.free_memory_gb if gpu.available else 8
 
                 if memory_gb >= 12:
                     return base_batch
@@ -332,7 +647,7 @@ class GPUManager:
             if device_id >= self.gpu_count:
                 return False, f"GPU {device_id} 不存在"
 
-            if not self.gpu_info[device_id].get("available", False):
+            if not self.gpu_info[device_id].available:
                 return False, f"GPU {device_id} 不可用"
 
         return True, "多GPU配置有效"
@@ -345,15 +660,14 @@ class GPUManager:
             "timestamp": datetime.now().isoformat(),
             "cuda_available": self.cuda_available,
             "gpu_count": self.gpu_count,
-            "gpu_info": self.gpu_info,
+            "gpu_info": [gpu.to_dict() for gpu in self.gpu_info],
             "nvidia_smi": self.get_nvidia_smi_info(),
             "optimal_config": self.get_optimal_device_setup(),
         }
 
         filepath.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(report, f, indent=2, ensure_ascii=False)
+        write_json(report, filepath)
 
 
 # 全域GPU管理器實例
@@ -364,5 +678,6 @@ def get_gpu_manager() -> GPUManager:
     """獲取GPU管理器實例"""
     global _gpu_manager
     if _gpu_manager is None:
+        configure_cuda_allocator()
         _gpu_manager = GPUManager()
     return _gpu_manager
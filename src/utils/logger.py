@@ -3,12 +3,64 @@
 提供統一的日誌管理功能
 """
 
+import atexit
+import faulthandler
+import functools
 import logging
 import os
+import platform
+import queue
 import sys
+import time
+import tracemalloc
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, Optional, Tuple, Union
+
+import psutil
+
+# 位元組 → GB 的換算係數
+_INV_GB = 1.0 / (1 << 30)
+
+# 日誌級別名稱 → 級別數值 (含 WARN、FATAL、NOTSET 別名；3.11+ 直接取用標準庫對照表)
+if hasattr(logging, "getLevelNamesMapping"):
+    _LEVEL_MAP = logging.getLevelNamesMapping()
+else:
+    _LEVEL_MAP = {
+        name: getattr(logging, name)
+        for name in (
+            "CRITICAL",
+            "FATAL",
+            "ERROR",
+            "WARN",
+            "WARNING",
+            "INFO",
+            "DEBUG",
+            "NOTSET",
+        )
+    }
+
+# 記憶體資訊快取秒數
+_VIRTUAL_MEMORY_TTL = 5.0
+_virtual_memory_cache: Tuple[float, Any] = (float("-inf"), None)
+
+
+@functools.lru_cache(maxsize=1)
+def _cpu_count() -> Optional[int]:
+    """CPU 核心數 (進程內不變)"""
+    return psutil.cpu_count()
+
+
+def _virtual_memory() -> Any:
+    """系統記憶體資訊，_VIRTUAL_MEMORY_TTL 秒內重複呼叫回傳快取結果"""
+    global _virtual_memory_cache
+    timestamp, memory = _virtual_memory_cache
+    now = time.monotonic()
+    if now - timestamp >= _VIRTUAL_MEMORY_TTL:
+        memory = psutil.virtual_memory()
+        _virtual_memory_cache = (now, memory)
+    return memory
 
 
 class ColoredFormatter(logging.Formatter):
@@ -24,30 +76,67 @@ class ColoredFormatter(logging.Formatter):
         "RESET": "\033[0m",  # 重置
     }
 
+    def __init__(self, *args, use_color: Optional[bool] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # 輸出被重新導向 (非終端機) 時不加入顏色代碼
+        if use_color is None:
+            use_color = sys.stdout.isatty()
+        self._use_color = use_color
+
+        # 預先建立各級別的前綴與重置代碼
+        self._reset = self.COLORS["RESET"]
+        self._prefix = {
+            level: code for level, code in self.COLORS.items() if level != "RESET"
+        }
+
     def format(self, record):
         # 獲取原始格式化結果
         original = super().format(record)
+        if not self._use_color:
+            return original
 
         # 添加顏色
-        color = self.COLORS.get(record.levelname, self.COLORS["RESET"])
-        reset = self.COLORS["RESET"]
+        return self._prefix.get(record.levelname, self._reset) + original + self._reset
+
+
+# 以 logging.getLogger(__name__) 記錄的模組，建立 YOLOLogger 時自動轉交其輸出
+_FORWARDED_LOGGERS = ("src.training",)
 
-        return f"{color}{original}{reset}"
+
+class _ForwardHandler(logging.Handler):
+    """將記錄轉交給目標日誌器的處理器 (沿用其級別與處理器)"""
+
+    def __init__(self, target: logging.Logger):
+        super().__init__()
+        self.target = target
+
+    def emit(self, record):
+        if self.target.isEnabledFor(record.levelno):
+            self.target.handle(record)
 
 
 class YOLOLogger:
-    """YOLOv8s 專用日誌器"""
+    """
+    YOLOv8s 專用日誌器
+
+    各級別方法支援 %-style 延遲格式化，例如 logger.debug("score=%.4f", score)；
+    級別未啟用時不會組裝訊息字串，熱路徑中應避免使用 f-string。
+    """
 
     def __init__(self, name: str = "YOLOv8s", level: str = "INFO"):
         self.name = name
         self.level = level
         self.logger = logging.getLogger(name)
-        self.logger.setLevel(getattr(logging, level.upper()))
+        self.logger.setLevel(_LEVEL_MAP[level.upper()])
 
         # 避免重複添加處理器
         if not self.logger.handlers:
             self._setup_handlers()
 
+        for module_name in _FORWARDED_LOGGERS:
+            self.attach(module_name)
+
     def _setup_handlers(self):
         """設置日誌處理器"""
         # 控制台處理器
@@ -63,13 +152,40 @@ class YOLOLogger:
 
         self.logger.addHandler(console_handler)
 
+    def attach(self, name: str):
+        """
+        將模組日誌器 (如 src.training) 的記錄轉交本日誌器輸出
+
+        模組日誌器已有的處理器與 propagate 設定維持不變；級別僅在未設定 (NOTSET)
+        時沿用本日誌器的級別，使用者自訂的級別不會被覆寫。
+
+        Args:
+            name: 模組日誌器名稱，其子日誌器 (logging.getLogger(__name__)) 一併適用
+        """
+        module_logger = logging.getLogger(name)
+        forwarder = next(
+            (h for h in module_logger.handlers if isinstance(h, _ForwardHandler)),
+            None,
+        )
+        if forwarder is None:
+            module_logger.addHandler(_ForwardHandler(self.logger))
+        else:
+            forwarder.target = self.logger
+        if module_logger.level == logging.NOTSET:
+            module_logger.setLevel(self.logger.level)
+
     def add_file_handler(self, log_file: Union[str, Path], level: str = "DEBUG"):
-        """添加文件處理器"""
+        """
+        添加文件處理器
+
+        寫檔由背景 QueueListener 執行緒負責，記錄日誌的呼叫端只需將記錄放入佇列；
+        佇列中的記錄會在進程結束時寫出。
+        """
         log_file = Path(log_file)
         log_file.parent.mkdir(parents=True, exist_ok=True)
 
         file_handler = logging.FileHandler(log_file, encoding="utf-8")
-        file_handler.setLevel(getattr(logging, level.upper()))
+        file_handler.setLevel(_LEVEL_MAP[level.upper()])
 
         # 文件格式化器（不使用顏色）
         file_formatter = logging.Formatter(
@@ -78,27 +194,37 @@ class YOLOLogger:
         )
         file_handler.setFormatter(file_formatter)
 
-        self.logger.addHandler(file_handler)
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
 
-    def info(self, message: str, **kwargs):
+        self.logger.addHandler(QueueHandler(log_queue))
+
+    def info(self, message: str, *args, **kwargs):
         """信息日誌"""
-        self.logger.info(message, **kwargs)
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(message, *args, **kwargs)
 
-    def debug(self, message: str, **kwargs):
+    def debug(self, message: str, *args, **kwargs):
         """調試日誌"""
-        self.logger.debug(message, **kwargs)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(message, *args, **kwargs)
 
-    def warning(self, message: str, **kwargs):
+    def warning(self, message: str, *args, **kwargs):
         """警告日誌"""
-        self.logger.warning(message, **kwargs)
+        if self.logger.isEnabledFor(logging.WARNING):
+            self.logger.warning(message, *args, **kwargs)
 
-    def error(self, message: str, **kwargs):
+    def error(self, message: str, *args, **kwargs):
         """錯誤日誌"""
-        self.logger.error(message, **kwargs)
+        if self.logger.isEnabledFor(logging.ERROR):
+            self.logger.error(message, *args, **kwargs)
 
-    def critical(self, message: str, **kwargs):
+    def critical(self, message: str, *args, **kwargs):
         """嚴重錯誤日誌"""
-        self.logger.critical(message, **kwargs)
+        if self.logger.isEnabledFor(logging.CRITICAL):
+            self.logger.critical(message, *args, **kwargs)
 
     def log_config(self, config: Dict[str, Any], title: str = "配置信息"):
         """記錄配置信息"""
@@ -108,35 +234,34 @@ class YOLOLogger:
         self.info("=" * (len(title) + 8))
 
     def log_system_info(self):
-        """記錄系統信息"""
-        import platform
-
-        import psutil
-
-        self.info("=== 系統信息 ===")
-        self.info(f"  操作系統: {platform.system()} {platform.release()}")
-        self.info(f"  Python 版本: {platform.python_version()}")
-        self.info(f"  CPU 核心數: {psutil.cpu_count()}")
-        self.info(f"  總記憶體: {psutil.virtual_memory().total / 1024**3:.1f} GB")
+        """記錄系統信息 (多行內容合併為單筆日誌)"""
+        lines = [
+            "=== 系統信息 ===",
+            f"  操作系統: {platform.system()} {platform.release()}",
+            f"  Python 版本: {platform.python_version()}",
+            f"  CPU 核心數: {_cpu_count()}",
+            f"  總記憶體: {_virtual_memory().total * _INV_GB:.1f} GB",
+        ]
 
         # GPU 信息
         try:
             import torch
 
             if torch.cuda.is_available():
-                self.info(f"  GPU 數量: {torch.cuda.device_count()}")
-                for i in range(torch.cuda.device_count()):
-                    gpu_name = torch.cuda.get_device_name(i)
-                    gpu_memory = (
-                        torch.cuda.get_device_properties(i).total_memory / 1024**3
+                gpu_count = torch.cuda.device_count()
+                lines.append(f"  GPU 數量: {gpu_count}")
+                for i in range(gpu_count):
+                    props = torch.cuda.get_device_properties(i)
+                    lines.append(
+                        f"    GPU {i}: {props.name} ({props.total_memory * _INV_GB:.1f} GB)"
                     )
-                    self.info(f"    GPU {i}: {gpu_name} ({gpu_memory:.1f} GB)")
             else:
-                self.info("  GPU: 不可用")
+                lines.append("  GPU: 不可用")
         except ImportError:
-            self.info("  GPU: 無法檢測 (PyTorch 未安裝)")
+            lines.append("  GPU: 無法檢測 (PyTorch 未安裝)")
 
-        self.info("=" * 16)
+        lines.append("=" * 16)
+        self.info("\n".join(lines))
 
     def log_training_start(self, config: Dict[str, Any]):
         """記錄訓練開始"""
@@ -166,8 +291,8 @@ class YOLOLogger:
 
     def log_trial_result(self, trial_number: int, score: float, params: Dict[str, Any]):
         """記錄試驗結果"""
-        self.info(f"✅ Trial {trial_number:3d} | Score: {score:.4f}")
-        self.debug(f"   參數: {params}")
+        self.info("✅ Trial %3d | Score: %.4f", trial_number, score)
+        self.debug("   參數: %s", params)
 
     def log_best_params(self, best_params: Dict[str, Any], best_score: float):
         """記錄最佳參數"""
@@ -235,7 +360,7 @@ def get_logger() -> YOLOLogger:
 
 
 def suppress_warnings():
-    """抑制常見警告"""
+    """抑制常見警告，並啟用 faulthandler 與可選的 tracemalloc 診斷"""
     import os
     import warnings
 
@@ -247,6 +372,22 @@ def suppress_warnings():
     # 設置環境變數
     os.environ["PYTHONWARNINGS"] = "ignore::UserWarning"
     os.environ["OPENCV_IO_ENABLE_OPENEXR"] = "1"
+    # 延遲載入 CUDA 核心模組，縮短 CUDA context 初始化時間
+    os.environ.setdefault("CUDA_MODULE_LOADING", "LAZY")
+
+    # 崩潰時輸出所有執行緒的 Python 堆疊 (無執行期開銷)
+    try:
+        faulthandler.enable()
+    except (AttributeError, ValueError):
+        pass  # Jupyter 等環境的 stderr 沒有檔案描述符
+
+    # YOLO_TRACEMALLOC=<堆疊深度> 時追蹤記憶體配置來源，便於診斷 OOM
+    try:
+        tracemalloc_frames = int(os.environ.get("YOLO_TRACEMALLOC", "0"))
+    except ValueError:
+        tracemalloc_frames = 0
+    if tracemalloc_frames > 0 and not tracemalloc.is_tracing():
+        tracemalloc.start(tracemalloc_frames)
 
     # PIL 警告抑制
     try:
@@ -58,16 +58,28 @@ def test_file_structure():
         'examples'
     ]
     
-    missing_files = []
-    missing_dirs = []
+    # 每個父目錄只 scandir 一次，以名稱集合判斷是否存在
+    listings = {}
     
-    for file_path in required_files:
-        if not os.path.exists(file_path):
-            missing_files.append(file_path)
+    def entries_of(path):
+        parent = os.path.dirname(path) or '.'
+        if parent not in listings:
+            try:
+                with os.scandir(parent) as it:
+                    listings[parent] = {entry.name: entry.is_dir() for entry in it}
+            except OSError:
+                listings[parent] = {}
+        return listings[parent]
     
-    for dir_path in required_dirs:
-        if not os.path.isdir(dir_path):
-            missing_dirs.append(dir_path)
+    missing_files = [
+        file_path for file_path in required_files
+        if os.path.basename(file_path) not in entries_of(file_path)
+    ]
+    
+    missing_dirs = [
+        dir_path for dir_path in required_dirs
+        if not entries_of(dir_path).get(os.path.basename(dir_path), False)
+    ]
     
     if missing_files:
         print(f"⚠️  缺少檔案: {missing_files}")
@@ -85,6 +97,9 @@ def test_config_files():
     try:
         import yaml
         
+        # 優先使用 libyaml C 實作的 Loader
+        loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+        
         config_files = [
             'config/base_config.yaml',
             'config/training_config.yaml', 
@@ -94,7 +109,7 @@ def test_config_files():
         for config_file in config_files:
             if os.path.exists(config_file):
                 with open(config_file, 'r', encoding='utf-8') as f:
-                    config = yaml.safe_load(f)
+                    config = yaml.load(f, Loader=loader)
                     if config:
                         print(f"✅ {config_file} 載入成功")
                     else:
@@ -105,6 +120,133 @@ def test_config_files():
     except ImportError:
         print("⚠️  PyYAML 未安裝，跳過 YAML 測試")
 
+def test_save_config_types():
+    """測試保存含 Path 與 numpy 數值的配置"""
+    print("🔍 測試配置保存 (Path / numpy)...")
+    
+    try:
+        import tempfile
+        
+        import numpy as np
+        
+        project_root = os.path.dirname(os.path.abspath(__file__))
+        if project_root not in sys.path:
+            sys.path.insert(0, project_root)
+        from src.utils.file_manager import FileManager
+    except ImportError as e:
+        print(f"⚠️  缺少依賴 ({e})，跳過配置保存測試")
+        return
+    
+    results = {
+        'model_path': Path('results/training/best.pt'),
+        'metrics': {'mAP50': np.float64(0.5), 'epochs': np.int64(10)},
+        'loss': np.array([0.5, float('nan')]),
+    }
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_manager = FileManager(tmp_dir)
+        for filename in ['results.yaml', 'results.json']:
+            try:
+                file_manager.save_config(results, Path(tmp_dir) / filename)
+                print(f"✅ {filename} 保存成功")
+            except Exception as e:
+                print(f"❌ {filename} 保存失敗: {e}")
+
+def _baseline_clean_directory(directory, patterns):
+    """原始 clean_directory 的逐一模式 rglob 實作，作為比對基準"""
+    import shutil
+    
+    removed_files = []
+    for pattern in patterns:
+        for filepath in Path(directory).rglob(pattern):
+            try:
+                if filepath.is_file():
+                    filepath.unlink()
+                    removed_files.append(filepath)
+                elif filepath.is_dir():
+                    shutil.rmtree(filepath)
+                    removed_files.append(filepath)
+            except OSError:
+                pass
+    return removed_files
+
+def test_clean_directory_patterns():
+    """測試 clean_directory 與原始 rglob 實作的結果一致"""
+    print("🔍 測試目錄清理模式...")
+    
+    try:
+        import tempfile
+        
+        project_root = os.path.dirname(os.path.abspath(__file__))
+        if project_root not in sys.path:
+            sys.path.insert(0, project_root)
+        from src.utils.file_manager import FileManager
+    except ImportError as e:
+        print(f"⚠️  缺少依賴 ({e})，跳過目錄清理測試")
+        return
+    
+    tree = [
+        'a.tmp', '.hidden.tmp', 'keep.txt', 'sub/b.tmp', 'sub/deep/c.tmp',
+        'logs/old.log', 'x/logs/q.log', 'x/z.log',
+        '__pycache__/m.pyc', 'pkg/__pycache__/n.pyc', 'pkg/o.pyc',
+    ]
+    cases = [
+        ['**/*.tmp'],
+        ['*.pyc', '__pycache__'],
+        ['__pycache__', '*.pyc'],
+        ['logs/*.log', '*.tmp'],
+        ['sub/**/*.tmp'],
+    ]
+    
+    def build(root):
+        for name in tree:
+            path = Path(root) / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text('x')
+    
+    def relative(root, paths):
+        return sorted(Path(p).relative_to(root).as_posix() for p in paths)
+    
+    for patterns in cases:
+        with tempfile.TemporaryDirectory() as base_dir, \
+                tempfile.TemporaryDirectory() as new_dir:
+            build(base_dir)
+            build(new_dir)
+            expected = relative(base_dir, _baseline_clean_directory(base_dir, patterns))
+            actual = relative(new_dir, FileManager(new_dir).clean_directory(new_dir, patterns))
+            remaining_base = relative(base_dir, Path(base_dir).rglob('*'))
+            remaining_new = relative(new_dir, Path(new_dir).rglob('*'))
+            if actual == expected and remaining_new == remaining_base:
+                print(f"✅ {patterns}: 刪除 {len(actual)} 項")
+            else:
+                print(f"❌ {patterns}: 預期 {expected}，實際 {actual}")
+
+def test_training_stats_timestamps():
+    """測試訓練統計的起訖時間與耗時"""
+    print("🔍 測試訓練統計時間戳...")
+    
+    try:
+        project_root = os.path.dirname(os.path.abspath(__file__))
+        if project_root not in sys.path:
+            sys.path.insert(0, project_root)
+        from src.training.callbacks import TrainingCallbacks
+        from src.training.utils import TrainingUtils
+    except ImportError as e:
+        print(f"⚠️  缺少依賴 ({e})，跳過訓練統計測試")
+        return
+    
+    callbacks = TrainingCallbacks()
+    callbacks.log_metrics(1, {'mAP50': 0.4})
+    callbacks.log_metrics(2, {'mAP50': 0.6})
+    stats = TrainingUtils.calculate_training_stats(
+        callbacks.metrics_history, callbacks.start_wall_time
+    )
+    
+    if stats['start_time'] and stats['end_time'] and stats['elapsed_seconds'] >= 0:
+        print(f"✅ 起訖時間: {stats['start_time']} → {stats['end_time']}")
+    else:
+        print(f"❌ 訓練統計缺少時間資訊: {stats}")
+
 def test_basic_imports():
     """測試基本模組導入 (不導入重型依賴)"""
     print("🔍 測試基本模組導入...")
@@ -133,6 +275,9 @@ def main():
     test_argparse()
     test_file_structure() 
     test_config_files()
+    test_save_config_types()
+    test_clean_directory_patterns()
+    test_training_stats_timestamps()
     test_basic_imports()
     
     print("\n🎉 基本功能測試完成！")